@@ -0,0 +1,169 @@
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import hashlib
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taixiu.coordinator import CoordinatorClient, RemoteDataManager, RemoteLotteryStore
+from taixiu.coordinator.protocol import MESSAGES, WRITES
+from taixiu.storage import DataManager, LotteryStore
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ===== REPORTING =====
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def digest(db, lottery):
+    users = sorted((uid, u.username, u.balance, u.wins, u.losses, u.total_bet, u.daily_streak) for uid, u in db.iter_users())
+    tickets = sorted(lottery.tickets)
+    return hashlib.sha256(json.dumps([users, tickets]).encode()).hexdigest()[:16], len(users), len(tickets)
+
+# ===== WORKER =====
+# One bot process: a replica against the coordinator, hammered with the
+# mutations the cogs make (bets, transfers, stats, daily, balance sets,
+# tickets, rounds) on a shared set of users so every process touches the
+# others' users. Debits and transfers wait for the coordinator's answer;
+# a burst's worth of them is in flight at once, like concurrent commands.
+async def worker(args):
+    rng = random.Random(args.seed)
+    client = CoordinatorClient(args.socket, [args.seed])
+    db = RemoteDataManager(client)
+    lottery = RemoteLotteryStore(client)
+    await db.load_async()
+    await lottery.load_async()
+
+    claims, conflicts, round_trips, rejected = 0, 0, [], 0
+    start = time.perf_counter()
+    for burst in range(args.ops // args.burst):
+        checked = []
+        for _ in range(args.burst):
+            uid = str(rng.randrange(args.users))
+            if db.get_user(uid) is None:
+                db.create_user(uid, f"user{uid}")
+            roll = rng.random()
+            if roll < 0.3:
+                checked.append(asyncio.ensure_future(db.debit_async(uid, rng.randint(1, 500))))
+            elif roll < 0.5:
+                db.credit(uid, rng.randint(1, 500))
+            elif roll < 0.65:
+                other = str(rng.randrange(args.users))
+                if db.get_user(other) is not None:
+                    checked.append(asyncio.ensure_future(db.transfer_async(uid, other, rng.randint(1, 200))))
+            elif roll < 0.85:
+                db.update_stats(uid, rng.random() < 0.5, rng.randint(1, 500))
+            elif roll < 0.9:
+                db.update_user(uid, daily_streak=rng.randint(1, 7))
+            elif roll < 0.95:
+                # Followed by deltas from this and other processes before the echo
+                db.update_user(uid, balance=rng.randint(0, 1000))
+            else:
+                lottery.buy(uid, rng.randint(1, 3))
+        rejected += sum(1 for result in await asyncio.gather(*checked) if not result)
+        # Round ownership: the same channels are contended by every worker
+        channel = rng.randrange(8)
+        sent = time.perf_counter()
+        owned = await client.request("claim_round", channel=channel)
+        round_trips.append(time.perf_counter() - sent)
+        claims += 1
+        if owned:
+            client.send("release_round", channel=channel)
+        else:
+            conflicts += 1
+        if args.seed == 0 and burst == args.ops // args.burst // 2:
+            await lottery.draw_round(3, datetime.now().astimezone() + timedelta(days=1))
+    elapsed = time.perf_counter() - start
+
+    # A reply comes after every earlier message of ours has been applied
+    await client.request("claim_round", channel=-1)
+    print(json.dumps({"ops": args.ops, "elapsed": elapsed, "claims": claims, "conflicts": conflicts, "rejected": rejected,
+                      "p50": percentile(round_trips, 0.5), "p99": percentile(round_trips, 0.99),
+                      "messages": MESSAGES.total(), "writes": WRITES.total()}), flush=True)
+    # Wait until every worker is done, then once more for their last pushes
+    await asyncio.get_running_loop().run_in_executor(None, sys.stdin.readline)
+    await client.request("claim_round", channel=-1)
+    print(json.dumps({"digest": digest(db, lottery)}), flush=True)
+    await client.close()
+
+# ===== HARNESS =====
+async def wait_for(path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"coordinator did not create {path}")
+        await asyncio.sleep(0.05)
+
+def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "taixiu.sock")
+        env = dict(os.environ, PYTHONPATH=ROOT, LOG_LEVEL="WARNING")
+        coordinator = subprocess.Popen([sys.executable, "-m", "taixiu.coordinator", socket_path], cwd=directory, env=env)
+        try:
+            asyncio.run(wait_for(socket_path))
+            workers = [
+                subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker", "--socket", socket_path,
+                                  "--seed", str(i), "--ops", str(args.ops), "--users", str(args.users),
+                                  "--burst", str(args.burst)],
+                                 cwd=directory, env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                for i in range(args.processes)
+            ]
+            stats = [json.loads(w.stdout.readline()) for w in workers]
+            for w in workers:
+                w.stdin.write("\n")
+                w.stdin.flush()
+            digests = [json.loads(w.stdout.readline())["digest"] for w in workers]
+            for w in workers:
+                w.wait()
+        finally:
+            coordinator.send_signal(signal.SIGTERM)
+            coordinator.wait()
+
+        # What the coordinator persisted on shutdown
+        db = DataManager(lambda: os.path.join(directory, "data.json"))
+        lottery = LotteryStore(lambda: os.path.join(directory, "lott.json"))
+        db.load()
+        lottery.load()
+        stored = list(digest(db, lottery))
+        overdrawn = sum(1 for _, user in db.iter_users() if not user.unlimited and user.balance < 0)
+
+    total = sum(s["ops"] for s in stats)
+    elapsed = max(s["elapsed"] for s in stats)
+    print(f"== {args.processes} processes x {args.ops:,} mutations, {args.users:,} shared users ==")
+    print(f"  mutations                 {total:>9,} ops {total / elapsed:>14,.0f} ops/s (all processes)")
+    for i, s in enumerate(stats):
+        print(f"  process {i}: {s['ops'] / s['elapsed']:>10,.0f} ops/s   claim_round p50 {s['p50'] * 1e6:,.0f} µs"
+              f" p99 {s['p99'] * 1e6:,.0f} µs   rounds owned elsewhere {s['conflicts']}/{s['claims']}")
+    messages, writes = sum(s["messages"] for s in stats), sum(s["writes"] for s in stats)
+    print(f"  socket writes             {writes:>9,}     {messages / writes:>14,.1f} messages/write (bot side)")
+    print(f"  debits/transfers refused  {sum(s['rejected'] for s in stats):>9,}     overdrawn balances {overdrawn:,}")
+    print(f"  coordinator on disk: {stored[0]} ({stored[1]:,} users, {stored[2]:,} tickets)")
+    for i, d in enumerate(digests):
+        print(f"  replica {i}:           {d[0]} {'ok' if d == stored else 'DIVERGED'}")
+    if overdrawn or any(d != stored for d in digests):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    # python -m benchmarks.coordinator --processes 4 --ops 50000
+    parser = argparse.ArgumentParser(description="Several bot processes against one coordinator subprocess")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=20_000, help="mutations per process")
+    parser.add_argument("--users", type=int, default=500, help="users shared by all processes")
+    parser.add_argument("--burst", type=int, default=100, help="mutations per event loop turn")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--socket", help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        asyncio.run(worker(args))
+    else:
+        run(args)
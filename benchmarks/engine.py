@@ -0,0 +1,205 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from taixiu.config import Config
+from taixiu.bot import create_app
+from taixiu.bot.tx import TaiXiu
+from taixiu.games.blackjack import Shoe, Hand, check_special_win, simulate
+from taixiu.storage import DataManager, LotteryStore, User
+
+# ===== FAKE DISCORD OBJECTS =====
+# Just enough of Context / TextChannel / Member for the command callbacks;
+# every send is counted instead of going over the network.
+class FakeMessage:
+    async def edit(self, **kwargs):
+        return self
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+        return FakeMessage()
+
+class FakeAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+class FakeUser:
+    display_avatar = FakeAvatar()
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+
+class FakeCtx:
+    def __init__(self, author, channel):
+        self.author = author
+        self.channel = channel
+        self.message = None
+
+    async def reply(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+# ===== REPORTING =====
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def report(name, samples, elapsed=None):
+    elapsed = elapsed if elapsed is not None else sum(samples)
+    rate = len(samples) / elapsed if elapsed else float("inf")
+    print(f"  {name:<34} {len(samples):>9,} ops {rate:>14,.0f} ops/s"
+          f"   p50 {percentile(samples, 0.5) * 1e6:>10,.1f} µs   p99 {percentile(samples, 0.99) * 1e6:>10,.1f} µs")
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+# ===== SYNTHETIC DATA =====
+def populate(store, count, seed=1):
+    rng = random.Random(seed)
+    for i in range(count):
+        store.users[str(i)] = User(
+            f"user{i}",
+            balance=rng.randint(0, 10_000_000),
+            daily_streak=rng.randint(0, 30),
+            wins=rng.randint(0, 500),
+            losses=rng.randint(0, 500),
+            total_bet=rng.randint(0, 10**9),
+        )
+    store.leaderboard.rebuild(store.users)
+    store.loaded = True
+
+def make_store(directory, users):
+    store = DataManager(lambda: os.path.join(directory, "data.json"))
+    populate(store, users)
+    return store
+
+# ===== BENCHMARKS =====
+async def bench_storage(directory, users):
+    store = make_store(directory, users)
+    store.mark_dirty()
+    start = time.perf_counter()
+    await store.flush_async(compact=True)
+    report("snapshot save", [time.perf_counter() - start])
+
+    start = time.perf_counter()
+    loaded = DataManager(store.get_path_func)
+    await loaded.load_async()
+    report("snapshot load", [time.perf_counter() - start])
+
+    samples = []
+    for _ in range(1000):
+        uid = str(random.randrange(users))
+        elapsed, _ = timed(store.credit, uid, random.randint(-1000, 1000))
+        samples.append(elapsed)
+    report("credit (journaled)", samples)
+    start = time.perf_counter()
+    await store.flush_async()
+    report("journal flush (1000 entries)", [time.perf_counter() - start])
+
+async def bench_leaderboard(directory, users, ops=10_000):
+    store = make_store(directory, users)
+    top, rank = [], []
+    for _ in range(ops):
+        store.update_user(str(random.randrange(users)), balance=random.randint(0, 10_000_000))
+        elapsed, _ = timed(store.get_top_users, 10)
+        top.append(elapsed)
+        elapsed, _ = timed(store.get_rank, str(random.randrange(users)))
+        rank.append(elapsed)
+    report("get_top_users(10) after update", top)
+    report("get_rank", rank)
+
+async def bench_round(directory, users, bettors, rounds):
+    store = make_store(directory, users)
+    # No per-channel send limit against the fake channel
+    app = create_app(Config(channel_rate=1_000_000), db=store)
+    manager = app.rounds
+    cog = TaiXiu(app)
+    channel = FakeChannel(1)
+    players = [FakeCtx(FakeUser(uid), channel) for uid in random.sample(range(users), min(bettors, users))]
+
+    async def place(ctx):
+        start = time.perf_counter()
+        await TaiXiu.cuoc.callback(cog, ctx, random.choice(("tai", "xiu")), str(random.randint(1, 1000)))
+        return time.perf_counter() - start
+
+    bet_samples, settle_samples, round_samples = [], [], []
+    for _ in range(rounds):
+        round_start = time.perf_counter()
+        await manager.start_game(channel)
+        bet_samples.extend(await asyncio.gather(*(place(ctx) for ctx in players)))
+        start = time.perf_counter()
+        await manager.end_game(channel)
+        settle_samples.append(time.perf_counter() - start)
+        round_samples.append(time.perf_counter() - round_start)
+    # Board edits and results are still queued in the outbox
+    await app.outbox.drain()
+    report(f"cuoc ({len(players)} concurrent bettors)", bet_samples, sum(round_samples))
+    report("end_game settlement", settle_samples)
+    report("full round", round_samples)
+    print(f"  messages sent to channel: {channel.sent:,} ({channel.sent / rounds:,.1f} per round)")
+
+def bench_lottery(directory, tickets):
+    store = LotteryStore(lambda: os.path.join(directory, "lott.json"))
+    buys = []
+    for i in range(0, tickets, 1000):
+        elapsed, _ = timed(store.buy, str(i % 5000), min(1000, tickets - i))
+        buys.append(elapsed)
+    report("lottery buy (1000 tickets)", buys)
+    draws = [timed(store.draw, 10)[0] for _ in range(1000)]
+    report(f"lottery draw(10) of {store.ticket_count:,}", draws)
+
+def bench_blackjack(hands):
+    shoe = Shoe(6, rng=random.Random(0))
+    dealt = [[shoe.draw() for _ in range(random.choice((2, 3, 4, 5)))] for _ in range(hands)]
+    report("deal hand (incremental total)", [timed(Hand, cards)[0] for cards in dealt])
+    built = [Hand(cards) for cards in dealt]
+    report("check_special_win", [timed(check_special_win, hand)[0] for hand in built])
+    elapsed, _ = timed(simulate, hands, 6, 15, random.Random(0))
+    print(f"  {'simulate (full rounds)':<34} {hands:>9,} ops {hands / elapsed:>14,.0f} ops/s")
+
+BENCHES = ("storage", "leaderboard", "round", "lottery", "blackjack")
+
+async def run(args):
+    for users in args.users:
+        print(f"\n== {users:,} users ==")
+        with tempfile.TemporaryDirectory() as directory:
+            if "storage" in args.only:
+                await bench_storage(directory, users)
+            if "leaderboard" in args.only:
+                await bench_leaderboard(directory, users)
+            if "round" in args.only:
+                await bench_round(directory, users, args.bettors, args.rounds)
+            if "lottery" in args.only:
+                bench_lottery(directory, users)
+    if "blackjack" in args.only:
+        print("\n== blackjack ==")
+        bench_blackjack(args.hands)
+
+if __name__ == "__main__":
+    # python -m benchmarks.engine --users 1000 100000 1000000 --bettors 500
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the TaixiuBot game engines")
+    parser.add_argument("--users", type=int, nargs="+", default=[1000, 100_000])
+    parser.add_argument("--bettors", type=int, default=100, help="concurrent ?cuoc callers per round")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--hands", type=int, default=100_000)
+    parser.add_argument("--only", type=lambda s: s.split(","), default=list(BENCHES),
+                        help=f"comma separated subset of {','.join(BENCHES)}")
+    args = parser.parse_args()
+    random.seed(0)
+    asyncio.run(run(args))
@@ -0,0 +1 @@
+from .app import App, create_app, run
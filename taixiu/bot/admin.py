@@ -0,0 +1,113 @@
+import math
+import logging
+from collections import Counter
+from datetime import timedelta
+
+from discord.ext import commands
+
+from .. import metrics
+from ..economy import format_balance
+from .embeds import create_embed
+
+log = logging.getLogger(__name__)
+
+def format_seconds(value):
+    if value is None:
+        return "-"
+    if value == float("inf"):
+        return "> 10s"
+    return f"≤ {value * 1000:g} ms"
+
+# Heartbeat latency is inf/nan until the shard's first heartbeat
+def format_latency(value):
+    if not math.isfinite(value):
+        return "-"
+    return f"{value * 1000:.0f} ms"
+
+# ===== ADMIN COMMANDS =====
+class Admin(commands.Cog):
+    def __init__(self, app):
+        self.db = app.db
+        self.rounds = app.rounds
+        self.bot = app.bot
+        self.shard_latencies = app.shard_latencies
+        self.cache_sizes = app.cache_sizes
+        self.memory_profile = app.config.memory_profile
+
+    async def cog_command_error(self, ctx, error):
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.reply(embed=create_embed("❌ Lỗi Quyền Hạn", "🛡️ Bạn cần quyền **Administrator** để sử dụng lệnh này!", 0xff0000))
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def win(self, ctx, result: str):
+        log.info("✨ Admin @%s forced result to: %s", ctx.author.name, result.upper())
+        result = result.lower()
+        if result not in ["tai", "xiu"]:
+            await ctx.reply("❌ Chọn `tai` hoặc `xiu`")
+            return
+        await self.rounds.end_game(ctx.channel, forced_result=result)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def moneyhack(self, ctx, amount: str):
+        user = self.db.get_user(str(ctx.author.id))
+        if not user:
+            user = self.db.create_user(str(ctx.author.id), ctx.author.name)
+
+        if amount.lower() == "inf":
+            self.db.update_user(str(ctx.author.id), unlimited=True, balance=0)
+            log.info("🤑 Admin @%s set balance to INF", ctx.author.name)
+            await ctx.reply(embed=create_embed("🤑 Money Hack Successful", f"💹 Số dư hiện tại: **{format_balance(0, unlimited=True)}**", 0x00ff00))
+        elif amount.lower() == "-inf":
+            self.db.update_user(str(ctx.author.id), unlimited=False, balance=0)
+            log.info("🤑 Admin @%s reset balance to 0", ctx.author.name)
+            await ctx.reply(embed=create_embed("🤑 Money Hack Reset", f"💹 Số dư hiện tại: **0** cash", 0x00ff00))
+        else:
+            try:
+                val = int(amount)
+                new_balance = (0 if user.unlimited else user.balance) + val
+                self.db.update_user(str(ctx.author.id), unlimited=False, balance=new_balance)
+                log.info("🤑 Admin @%s used moneyhack: +%d", ctx.author.name, val)
+                await ctx.reply(embed=create_embed("🤑 Money Hack Successful", f"💰 Đã thêm **{val:,}** vào tài khoản của bạn.\n💹 Số dư mới: **{format_balance(new_balance)}**", 0x00ff00))
+            except ValueError:
+                await ctx.reply("❌ Số tiền không hợp lệ. Sử dụng `inf`, `-inf` hoặc một con số.")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx):
+        uptime = timedelta(seconds=int(metrics.METRICS.uptime()))
+        desc = (
+            f"⏱️ Uptime: **{uptime}**\n"
+            f"🎲 Bàn đang chạy: **{self.rounds.games.running_count()}**\n"
+            f"💸 Lượt cược: **{metrics.BETS.total():,}**\n\n"
+            f"⌨️ Lệnh: **{metrics.COMMAND_SECONDS.count():,}** (lỗi {metrics.COMMAND_ERRORS.total():,})\n"
+            f"　p50 {format_seconds(metrics.COMMAND_SECONDS.quantile(0.5))} · p99 {format_seconds(metrics.COMMAND_SECONDS.quantile(0.99))}\n"
+            f"🏁 Chốt ván p99: {format_seconds(metrics.SETTLE_SECONDS.quantile(0.99))}\n"
+            f"💾 Ghi đĩa p99: {format_seconds(metrics.FLUSH_SECONDS.quantile(0.99))}\n"
+            f"🔁 Event loop lag p99: {format_seconds(metrics.LOOP_LAG.quantile(0.99))}\n\n"
+            f"🌐 Discord API: **{metrics.API_CALLS.total():,}** request, **{metrics.RATE_LIMITS.total():,}** lần 429\n"
+            f"🧠 RAM: **{metrics.rss_bytes() / 2**20:,.1f} MB** (profile {self.memory_profile}, `?mem` để xem chi tiết)\n\n"
+        )
+        guilds = Counter(guild.shard_id for guild in self.bot.guilds)
+        running = self.rounds.games.running_by_shard()
+        desc += "\n".join(
+            f"🛰️ Shard {shard_id}: {format_latency(latency)} · {guilds[shard_id]:,} server · {running.get(shard_id, 0)} bàn"
+            for shard_id, latency in sorted(self.shard_latencies().items())
+        )
+        await ctx.reply(embed=create_embed("📈 THỐNG KÊ BOT", desc, 0x00aaff))
+
+    @commands.command(aliases=["memory"])
+    @commands.has_permissions(administrator=True)
+    async def mem(self, ctx):
+        total, common = metrics.object_counts()
+        desc = (
+            f"🧩 Profile: **{self.memory_profile}**\n"
+            f"💾 RSS: **{metrics.rss_bytes() / 2**20:,.1f} MB**\n"
+            f"🐍 Object Python: **{total:,}**\n\n"
+            "📦 **Cache discord.py**\n"
+            + "\n".join(f"`{name}`: {count:,}" for name, count in self.cache_sizes().items())
+            + "\n\n🔢 **Kiểu nhiều nhất**\n"
+            + "\n".join(f"`{name}`: {count:,}" for name, count in common)
+        )
+        await ctx.reply(embed=create_embed("🧠 BỘ NHỚ", desc, 0x00aaff))
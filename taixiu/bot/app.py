@@ -0,0 +1,307 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import discord
+from discord.ext import commands
+
+from .. import metrics
+from ..config import Config, shard_scoped_path
+from ..coordinator import CoordinatorClient, RemoteDataManager, RemoteLotteryStore
+from ..identity import IdentityCache
+from ..outbox import Outbox
+from ..scheduler import Scheduler
+from ..storage import STORAGE_EXECUTOR, create_data_manager, write_behind_task, LotteryStore, SessionStore
+from .rounds import RoundManager
+from .tx import TaiXiu
+from .economy import Economy
+from .marriage import Marriage
+from .lottery import Lottery
+from .blackjack import Blackjack
+from .admin import Admin
+from .fun import Fun
+
+log = logging.getLogger(__name__)
+
+COGS = (TaiXiu, Economy, Marriage, Lottery, Blackjack, Admin, Fun)
+# Seconds between write-backs of renamed users' stored usernames
+RENAME_FLUSH_INTERVAL = 60
+
+# Metric label of an interaction: /name for slash commands, the custom_id
+# for buttons and modals
+def interaction_name(interaction):
+    if interaction.command is not None:
+        return "/" + interaction.command.qualified_name
+    return (interaction.data or {}).get("custom_id", "interaction")
+
+# Gateway intents and discord.py caches for the memory profile. "low" keeps
+# what the commands read: guilds (channels, shard ids) and, for ?commands,
+# messages. Nothing else is cached: authors and mentions come with each
+# message or interaction, and other users from the IdentityCache / REST.
+def client_options(config):
+    if config.memory_profile == "low":
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.dm_messages = True
+        options = dict(max_messages=None, member_cache_flags=discord.MemberCacheFlags.none(), chunk_guilds_at_startup=False)
+    else:
+        intents = discord.Intents.default()
+        options = {}
+    if config.prefix_commands:
+        intents.guild_messages = True
+        intents.message_content = True
+    else:
+        # Interactions arrive regardless; guild messages would only be
+        # an event per message that nothing reads
+        intents.guild_messages = False
+    return dict(intents=intents, **options)
+
+# ===== APP =====
+# Owns the bot and everything it works on. Building one touches neither the
+# disk nor the network: the stores are read in the background once the bot
+# has logged in, and commands that arrive before that wait for it.
+class App:
+    def __init__(self, config, db=None, lottery_store=None, session_store=None):
+        self.config = config
+        if config.coordinator_socket:
+            # Users and the lottery are shared with other processes through
+            # the coordinator, which also persists them
+            self.coordinator = CoordinatorClient(config.coordinator_socket, config.shard_ids)
+            self.db = db or RemoteDataManager(self.coordinator)
+            self.lottery_store = lottery_store or RemoteLotteryStore(self.coordinator)
+        else:
+            self.coordinator = None
+            self.db = db or create_data_manager(config)
+            self.lottery_store = lottery_store or LotteryStore(config.lott_path, **config.store_options)
+        # Open blackjack hands, whose stakes are already debited. Hands live in
+        # their channel's shard, so processes splitting the shards keep apart.
+        sessions_path = config.sessions_path
+        if config.shard_ids is not None:
+            sessions_path = lambda: shard_scoped_path(config.sessions_path(), config.shard_ids)
+        self.session_store = session_store or SessionStore(sessions_path, ledger=self.db, **config.store_options)
+        # Loaded in this order (users first) and flushed by one task each
+        self.stores = (self.db, self.lottery_store, self.session_store)
+
+        options = client_options(config)
+        if config.sharded:
+            # Each shard is its own gateway connection and guild cache;
+            # discord.py routes every guild's events to its shard
+            self.bot = commands.AutoShardedBot(command_prefix="?", help_command=None, shard_count=config.shard_count,
+                                               shard_ids=config.shard_ids, **options)
+        else:
+            self.bot = commands.Bot(command_prefix="?", help_command=None, **options)
+
+        # Round traffic (announcements, bet board, results) goes through
+        # per-channel send queues that stay inside Discord's rate limits
+        self.outbox = Outbox(config.channel_rate, config.channel_per, config.board_interval)
+        # Names for ?profile / ?top without a REST call per lookup
+        self.identity = IdentityCache(self.bot, self.db, config.identity_ttl, config.identity_cache_size)
+        # Wall-clock deadlines (the lottery draw), re-armed from stored state on start
+        self.scheduler = Scheduler()
+        self.rounds = RoundManager(self.db, self.outbox, config.bet_board, coordinator=self.coordinator)
+
+        self.loading = None
+        self.background_tasks = []
+        self.metrics_server = None
+
+        self.bot.setup_hook = self.setup_hook
+        self.bot.event(self.on_ready)
+        self.bot.event(self.on_command_error)
+        self.bot.event(self.on_shard_ready)
+        self.bot.event(self.on_shard_disconnect)
+        self.bot.event(self.on_shard_resumed)
+        self.bot.before_invoke(self.before_invoke)
+        self.bot.after_invoke(self.after_invoke)
+        self.bot.tree.error(self.on_interaction_error)
+
+        # Read when metrics are scraped
+        metrics.METRICS.gauge("taixiu_games_running", "Channels with a round in progress", self.rounds.games.running_count)
+        metrics.METRICS.gauge("taixiu_outbox_channels", "Channels with an active send queue", lambda: len(self.outbox.channels))
+        metrics.METRICS.gauge("taixiu_shard_latency_seconds", "Gateway heartbeat latency", self.shard_latencies, label="shard")
+        metrics.METRICS.gauge("taixiu_shard_games_running", "Channels with a round in progress", self.rounds.games.running_by_shard, label="shard")
+        metrics.METRICS.gauge("taixiu_discord_cache_objects", "Objects in discord.py's caches", self.cache_sizes, label="cache")
+
+    # ----- startup -----
+    async def setup_hook(self):
+        # Runs after login, before the gateway connects; main() may call
+        # bot.start() again after errors, but all of this must happen once
+        if self.loading is not None:
+            return
+        for cog in COGS:
+            await self.bot.add_cog(cog(self))
+        # Slash commands are global, so one process publishes them
+        if self.config.sync_commands and self.config.owns_global_tasks:
+            try:
+                synced = await self.bot.tree.sync()
+                log.info("🔁 Synced %d slash commands", len(synced))
+            except discord.HTTPException as e:
+                log.warning("⚠️ Could not sync slash commands: %s", e)
+        metrics.instrument_http(self.bot.http)
+        self.metrics_server = await metrics.start_http(self.config.metrics_port) if self.config.metrics_port else False
+        # Reading the stores scales with the data, so it runs on the storage
+        # thread while the gateway connects instead of before
+        self.loading = asyncio.create_task(self.load())
+
+    async def load(self):
+        start = time.perf_counter()
+        for store in self.stores:
+            if not store.loaded:
+                await store.load_async()
+        log.info("📂 Stores loaded in %.2fs", time.perf_counter() - start)
+        self.bot.dispatch("stores_loaded")
+
+    def is_loading(self):
+        return self.loading is not None and not self.loading.done()
+
+    async def wait_loaded(self):
+        if self.is_loading():
+            # Shielded so a cancelled command doesn't cancel the load
+            await asyncio.shield(self.loading)
+
+    async def on_ready(self):
+        log.info("✅ Logged in as %s", self.bot.user)
+        # on_ready fires again after reconnects; keep a single flusher running
+        if not self.background_tasks:
+            loop = asyncio.get_running_loop()
+            for store in self.stores:
+                self.background_tasks.append(loop.create_task(write_behind_task(store)))
+            self.background_tasks.append(self.scheduler.start())
+            self.background_tasks.append(loop.create_task(self.identity_refresh_task()))
+            self.background_tasks.append(loop.create_task(metrics.loop_lag_task()))
+            if self.config.metrics_file:
+                self.background_tasks.append(loop.create_task(metrics.dump_task(
+                    self.config.metrics_file, self.config.metrics_dump_interval, executor=STORAGE_EXECUTOR)))
+            caches = ", ".join(f"{name}={count:,}" for name, count in self.cache_sizes().items())
+            log.info("🧠 Memory profile %s: RSS %.1f MB, %s", self.config.memory_profile, metrics.rss_bytes() / 2**20, caches)
+
+    # Objects held in discord.py's caches, the part of RSS the memory profile controls
+    def cache_sizes(self):
+        guilds = self.bot.guilds
+        return {
+            "guilds": len(guilds),
+            "channels": sum(len(guild.channels) for guild in guilds),
+            "roles": sum(len(guild.roles) for guild in guilds),
+            "members": sum(len(guild.members) for guild in guilds),
+            "users": len(self.bot.users),
+            "emojis": len(self.bot.emojis),
+            "messages": len(self.bot.cached_messages),
+        }
+
+    async def on_shard_ready(self, shard_id):
+        log.info("🛰️ Shard %d ready", shard_id)
+
+    async def on_shard_disconnect(self, shard_id):
+        log.warning("⚠️ Shard %d disconnected", shard_id)
+
+    async def on_shard_resumed(self, shard_id):
+        log.info("🛰️ Shard %d resumed", shard_id)
+
+    # {shard id: heartbeat latency in seconds}; an unsharded bot is shard 0
+    def shard_latencies(self):
+        if self.config.sharded:
+            return dict(self.bot.latencies)
+        return {0: self.bot.latency}
+
+    async def identity_refresh_task(self):
+        while True:
+            await asyncio.sleep(RENAME_FLUSH_INTERVAL)
+            self.identity.flush_renames()
+
+    # ----- commands -----
+    async def before_invoke(self, ctx):
+        await self.wait_loaded()
+        # The rows the command is about to read, loaded off the event loop
+        await self.db.prefetch(str(ctx.author.id), *(str(member.id) for member in ctx.message.mentions))
+        # Keeps stored usernames current for users who run commands
+        self.identity.observe(ctx.author)
+        ctx.started_at = time.perf_counter()
+
+    # before_invoke and after_invoke for slash commands, buttons and modals:
+    # `async with app.prepare_interaction(interaction):` around the handler.
+    # An interaction must be answered within 3 seconds, so it is deferred if
+    # the stores are still loading; a button click just acknowledged, since
+    # its handler edits the message it is on. A handler that answers with a
+    # modal can't be deferred and checks is_loading itself instead.
+    @asynccontextmanager
+    async def prepare_interaction(self, interaction):
+        if self.is_loading():
+            if interaction.type == discord.InteractionType.component:
+                await interaction.response.defer()
+            else:
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            await self.wait_loaded()
+        await self.db.prefetch(str(interaction.user.id))
+        self.identity.observe(interaction.user)
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            metrics.COMMAND_SECONDS.observe(time.perf_counter() - started_at, command=interaction_name(interaction))
+
+    async def after_invoke(self, ctx):
+        # Runs after the handler whether or not it raised
+        started_at = getattr(ctx, "started_at", None)
+        if started_at is not None:
+            metrics.COMMAND_SECONDS.observe(time.perf_counter() - started_at, command=ctx.command.qualified_name)
+        if ctx.command_failed:
+            metrics.COMMAND_ERRORS.inc(command=ctx.command.qualified_name)
+
+    async def on_command_error(self, ctx, error):
+        if isinstance(error, commands.CommandNotFound):
+            return
+        await ctx.send(f"❌ Lỗi: {error}")
+        raise error
+
+    # Errors of slash commands (the tree's handler) and of buttons and
+    # modals (their views' on_error)
+    async def on_interaction_error(self, interaction, error):
+        name = interaction_name(interaction)
+        metrics.COMMAND_ERRORS.inc(command=name)
+        log.error("❌ Interaction %s failed: %s", name, error, exc_info=error)
+        try:
+            if interaction.response.is_done():
+                await interaction.followup.send(f"❌ Lỗi: {error}", ephemeral=True)
+            else:
+                await interaction.response.send_message(f"❌ Lỗi: {error}", ephemeral=True)
+        except discord.HTTPException:
+            pass
+
+    # ===== MAIN LOOP =====
+    async def main(self):
+        try:
+            while True:
+                try:
+                    await self.bot.start(self.config.token)
+                except discord.errors.HTTPException as e:
+                    if e.status == 429:
+                        wait_time = int(e.response.headers.get("Retry-After", 60))
+                        log.warning("⚠️ Rate limited. Retrying in %d seconds...", wait_time)
+                        await asyncio.sleep(wait_time)
+                    else:
+                        raise e
+                except Exception as e:
+                    log.exception("❌ Unexpected error: %s", e)
+                    await asyncio.sleep(10)
+        finally:
+            # Unsettled rounds give their stakes back before the final flush
+            await self.rounds.close()
+            # Fold the journals into final snapshots; a store that never
+            # finished loading has nothing of ours to write
+            for store in self.stores:
+                if store.loaded:
+                    await store.flush_async(compact=True)
+            if self.coordinator is not None:
+                # Sends whatever is still buffered
+                await self.coordinator.close()
+
+def create_app(config=None, db=None, lottery_store=None, session_store=None):
+    return App(config or Config.from_env(), db=db, lottery_store=lottery_store, session_store=session_store)
+
+def run(config=None):
+    config = config or Config.from_env()
+    logging.basicConfig(level=config.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if not config.token:
+        log.critical("❌ No DISCORD_TOKEN found in environment variables.")
+        raise SystemExit(1)
+    asyncio.run(create_app(config).main())
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import functools
+from datetime import timedelta
+
+import discord
+from discord import ui
+from discord.ext import commands
+
+from ..clock import get_now_utc7
+from ..economy import format_balance
+from ..games.blackjack import (Shoe, Hand, WIN, PUSH, LOSE, NGU_LINH, XI_BANG, MAX_CARDS, check_special_win,
+                               format_card, format_hand, resolve_deal, play_dealer, resolve_stand)
+from .embeds import create_embed
+
+log = logging.getLogger(__name__)
+
+# Seconds a hand waits for the player's next click before it is stood for them
+SESSION_TIMEOUT = 60
+# Hands one player may have open at the same time
+MAX_SESSIONS_PER_USER = 3
+
+# One instance serves every blackjack message: the buttons have fixed
+# custom_ids and the hand is looked up by message id in the session store,
+# so the view is registered once and keeps working after a restart
+class BlackjackView(ui.View):
+    def __init__(self, cog, disabled=False):
+        super().__init__(timeout=None)
+        self.cog = cog
+        if disabled:
+            for child in self.children:
+                if hasattr(child, "disabled"):
+                    child.disabled = True
+
+    @ui.button(label="Bốc (Hit)", style=discord.ButtonStyle.green, emoji="➕", custom_id="blackjack:hit")
+    async def hit(self, interaction: discord.Interaction, button: ui.Button):
+        await self.cog.on_button(interaction, self.cog.do_hit)
+
+    @ui.button(label="Dằn (Stand)", style=discord.ButtonStyle.red, emoji="✋", custom_id="blackjack:stand")
+    async def stand(self, interaction: discord.Interaction, button: ui.Button):
+        await self.cog.on_button(interaction, self.cog.do_stand)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item: ui.Item):
+        await self.cog.interaction_error(interaction, error)
+
+# ===== BLACKJACK =====
+class Blackjack(commands.Cog):
+    def __init__(self, app):
+        self.bot = app.bot
+        self.db = app.db
+        self.sessions = app.session_store
+        self.scheduler = app.scheduler
+        self.outbox = app.outbox
+        self.prepare = app.prepare_interaction
+        self.interaction_error = app.on_interaction_error
+        # One shoe for every table, reshuffled when it runs low
+        self.shoe = Shoe(app.config.blackjack_decks)
+        # Registered once, handles the clicks of every hand
+        self.view = BlackjackView(self)
+        # What is actually attached to messages: stopped copies are only
+        # components, so discord.py keeps nothing per message for them
+        self.open_buttons = self._buttons(disabled=False)
+        self.closed_buttons = self._buttons(disabled=True)
+        # Set once the hands stored before a restart were refunded or re-armed;
+        # clicks wait for it so none of them races the startup pass
+        self.resumed = asyncio.Event()
+
+    def _buttons(self, disabled):
+        view = BlackjackView(self, disabled)
+        view.stop()
+        return view
+
+    async def cog_load(self):
+        self.bot.add_view(self.view)
+
+    # Dispatched by App.load. Hands whose deadline passed while the bot was
+    # down (or whose message was never sent) are refunded: the player had no
+    # way to act on them. The others get their timeouts back.
+    @commands.Cog.listener()
+    async def on_stores_loaded(self):
+        now = get_now_utc7()
+        try:
+            for session in list(self.sessions.sessions.values()):
+                if session.message_id is None or session.expires_at <= now:
+                    await self.refund(session)
+                else:
+                    self.arm(session)
+        finally:
+            self.resumed.set()
+
+    # ----- sessions -----
+    def arm(self, session):
+        self.scheduler.schedule(f"blackjack:{session.id}", session.expires_at, functools.partial(self.expire, session.id))
+
+    def touch(self, session, **fields):
+        self.sessions.update(session, expires_at=get_now_utc7() + timedelta(seconds=SESSION_TIMEOUT), **fields)
+        self.arm(session)
+
+    def close(self, session):
+        self.sessions.close(session)
+        self.scheduler.cancel(f"blackjack:{session.id}")
+
+    async def on_button(self, interaction, action):
+        async with self.prepare(interaction):
+            # Hands aren't known until the stored ones were refunded or
+            # re-armed; the click has to be answered within 3 seconds, so it
+            # is deferred until then
+            if not self.resumed.is_set():
+                if not interaction.response.is_done():
+                    await interaction.response.defer()
+                await self.resumed.wait()
+            session = self.sessions.for_message(interaction.message.id)
+            if session is None:
+                return await self.notify(interaction, "Ván bài đã kết thúc!")
+            if str(interaction.user.id) != session.user_id:
+                return await self.notify(interaction, "Đây không phải ván bài của bạn!")
+            # Clicks are handled one at a time per player and ignored once settled,
+            # so a double click can neither pay out twice nor reorder message edits
+            async with self.db.locked(session.user_id):
+                if self.sessions.get(session.id) is None:
+                    return await self.notify(interaction, "Ván bài đã kết thúc!")
+                await action(session, interaction)
+
+    # ----- replies to a click, deferred or not -----
+    async def notify(self, interaction, content):
+        if interaction.response.is_done():
+            await interaction.followup.send(content, ephemeral=True)
+        else:
+            await interaction.response.send_message(content, ephemeral=True)
+
+    async def update(self, interaction, embed, view):
+        if interaction.response.is_done():
+            await interaction.edit_original_response(embed=embed, view=view)
+        else:
+            await interaction.response.edit_message(embed=embed, view=view)
+
+    # The player went quiet: the hand is stood for them
+    async def expire(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        async with self.db.locked(session.user_id):
+            if self.sessions.get(session_id) is not None:
+                await self.do_stand(session, None)
+
+    async def refund(self, session):
+        # Under the player's lock like clicks and timeouts, and skipped if one
+        # of them settled the hand first
+        async with self.db.locked(session.user_id):
+            if self.sessions.get(session.id) is None:
+                return
+            self.db.credit(session.user_id, session.bet)
+            self.close(session)
+            log.info("↩️ Refunded blackjack session=%d user=%s bet=%d", session.id, session.user_id, session.bet)
+            embed = create_embed("↩️ HOÀN TIỀN", f"Ván bài đã hết hạn khi bot tạm ngưng. Bạn được hoàn lại **{session.bet:,}** cash!", 0xffff00)
+            await self.edit_message(session, embed)
+
+    # Edits a hand's message outside of an interaction (timeouts, refunds)
+    async def edit_message(self, session, embed):
+        if session.message_id is None:
+            return
+        try:
+            channel = self.bot.get_channel(session.channel_id) or await self.bot.fetch_channel(session.channel_id)
+            message = channel.get_partial_message(session.message_id)
+            await self.outbox.submit(channel, lambda: message.edit(embed=embed, view=self.closed_buttons))
+        except discord.HTTPException as e:
+            log.warning("⚠️ Could not update blackjack message %s: %s", session.message_id, e)
+
+    async def end_game(self, session, interaction, title, description, color):
+        player_hand = Hand(session.player)
+        dealer_hand = Hand(session.dealer)
+        # Dealer plays out even if player busted or stood
+        play_dealer(dealer_hand, self.shoe)
+        self.close(session)
+
+        if interaction is None:
+            description = "⏰ Hết thời gian, bài của bạn đã được tự động dằn.\n" + description
+        embed = create_embed(title, description, color)
+        embed.add_field(name="Nhà cái", value=f"{format_hand(dealer_hand)} (Tổng: {dealer_hand.value})", inline=True)
+        embed.add_field(name=session.username, value=f"{format_hand(player_hand)} (Tổng: {player_hand.value})", inline=True)
+
+        if interaction is None:
+            await self.edit_message(session, embed)
+        elif interaction.message:
+            await self.update(interaction, embed, self.closed_buttons)
+
+    async def do_hit(self, session, interaction):
+        player_hand = Hand(session.player)
+        if len(player_hand) >= MAX_CARDS:
+            return await self.notify(interaction, "Bạn đã bốc tối đa 5 lá!")
+
+        player_hand.add(self.shoe.draw())
+        self.touch(session, player=player_hand.cards)
+        player_value = player_hand.value
+        special = check_special_win(player_hand)
+
+        if special == NGU_LINH:
+            self.db.credit(session.user_id, session.bet * 2)
+            self.db.update_stats(session.user_id, True, session.bet)
+            await self.end_game(session, interaction, "🎉 THẮNG!", f"Bạn đã thắng vì **Ngũ linh**, sigma! Nhận được **{session.bet * 2:,}** cash!", 0x00ff00)
+        elif player_value > 21:
+            self.db.update_stats(session.user_id, False, session.bet)
+            await self.end_game(session, interaction, "💥 QUÁ 21 (BUST)!", f"Bạn đã bốc quá 21 và thua **{session.bet:,}** cash!", 0xff0000)
+        else:
+            if interaction.message and interaction.message.embeds:
+                embed = interaction.message.embeds[0]
+                embed.set_field_at(1, name=session.username, value=f"{format_hand(player_hand)} (Tổng: {player_value})", inline=True)
+                await self.update(interaction, embed, self.open_buttons)
+
+    async def do_stand(self, session, interaction):
+        dealer_hand = Hand(session.dealer)
+        play_dealer(dealer_hand, self.shoe)
+        session.dealer = dealer_hand.cards
+        outcome, player_special, dealer_special, player_is_non, dealer_is_non = resolve_stand(Hand(session.player), dealer_hand)
+
+        if outcome == PUSH:
+            self.db.credit(session.user_id, session.bet)
+            msg = "Cả hai đều chưa đủ 15 điểm (NON)!" if (player_is_non and dealer_is_non) else "Điểm bằng nhau!"
+            await self.end_game(session, interaction, "🤝 HÒA (PUSH)!", f"{msg} Bạn được hoàn lại **{session.bet:,}** cash!", 0xffff00)
+        elif outcome == WIN:
+            win_amount = session.bet * 2
+            self.db.credit(session.user_id, win_amount)
+            self.db.update_stats(session.user_id, True, session.bet)
+            if dealer_is_non:
+                msg = "Nhà cái chưa đủ 15 điểm (NON)!"
+            else:
+                msg = f"Bạn đã thắng vì **{player_special}**" if player_special else "Bạn cao điểm hơn nhà cái!"
+            await self.end_game(session, interaction, "🎉 THẮNG!", f"{msg} Nhận được **{win_amount:,}** cash!", 0x00ff00)
+        else:
+            self.db.update_stats(session.user_id, False, session.bet)
+            if player_is_non:
+                msg = "Bạn chưa đủ 15 điểm (NON)!"
+            else:
+                msg = f"Nhà cái đã thắng vì **{dealer_special}**" if dealer_special else "Điểm của bạn thấp hơn nhà cái!"
+            await self.end_game(session, interaction, "💀 THUA!", f"{msg} Mất **{session.bet:,}** cash!", 0xff0000)
+
+    # ----- command -----
+    @commands.command(aliases=["bj"])
+    async def blackjack(self, ctx, amount: str):
+        user_id = str(ctx.author.id)
+        user = self.db.get_user(user_id)
+        if not user:
+            user = self.db.create_user(user_id, ctx.author.name)
+
+        if self.sessions.user_session_count(user_id) >= MAX_SESSIONS_PER_USER:
+            return await ctx.reply(f"❌ Bạn đang có {MAX_SESSIONS_PER_USER} ván blackjack chưa kết thúc!")
+
+        if amount.lower() == "all":
+            if user.unlimited:
+                return await ctx.reply(embed=create_embed("❌ Lỗi", "Bạn nhiều tiền đến nổi hệ thống bị ngu, deck đếm được số tiền này. Vui lòng thử lại với số tiền hợp lý!", 0xff0000))
+            bet = user.balance
+        else:
+            try:
+                bet = int(amount.replace(",", "").replace(".", ""))
+            except ValueError:
+                return await ctx.reply("❌ Số tiền không hợp lệ.")
+
+        if bet <= 0 or await self.db.debit_async(user_id, bet) is None:
+            return await ctx.reply(f"❌ Bạn không đủ tiền! Số dư: **{format_balance(user.balance, user.unlimited)}** cash")
+
+        self.shoe.begin_round()
+        player_hand = Hand((self.shoe.draw(), self.shoe.draw()))
+        dealer_hand = Hand((self.shoe.draw(), self.shoe.draw()))
+
+        outcome = resolve_deal(player_hand, dealer_hand)
+        if outcome == LOSE:
+            dealer_special = check_special_win(dealer_hand)
+            msg = f"Nhà cái đã thắng vì **{dealer_special}**, "
+            msg += "haha!" if dealer_special == XI_BANG else "gà!"
+            self.db.update_stats(user_id, False, bet)
+            embed = create_embed("💀 THUA!", f"Nhà cái lật bài: {format_hand(dealer_hand)}\n{msg} Mất **{bet:,}** cash!", 0xff0000, thumbnail=ctx.author.display_avatar.url)
+            return await ctx.send(embed=embed)
+        elif outcome == WIN:
+            player_special = check_special_win(player_hand)
+            win_amount = bet * 2
+            self.db.credit(user_id, win_amount)
+            self.db.update_stats(user_id, True, bet)
+            msg = f"Bạn đã thắng vì **{player_special}**, "
+            msg += "ez!" if player_special == XI_BANG else "gg!"
+            embed = create_embed("🎉 THẮNG!", f"Bạn đã có: {format_hand(player_hand)}\n{msg} Nhận được **{win_amount:,}** cash!", 0x00ff00, thumbnail=ctx.author.display_avatar.url)
+            return await ctx.send(embed=embed)
+
+        # Stored before the message goes out; a hand whose message never
+        # made it is refunded on the next start
+        session = self.sessions.open(user_id, ctx.author.name, ctx.channel.id, bet, player_hand.cards, dealer_hand.cards,
+                                     get_now_utc7() + timedelta(seconds=SESSION_TIMEOUT))
+
+        embed = create_embed("🃏 BLACKJACK", f"@{ctx.author.name}, Bạn đã cược **{bet:,}** vào ván bài!", 0x0099ff, thumbnail=ctx.author.display_avatar.url)
+        embed.add_field(name="Nhà cái", value=f"{format_card(dealer_hand.cards[0])}, ???", inline=True)
+        embed.add_field(name=ctx.author.name, value=f"{format_hand(player_hand)} (Tổng: {player_hand.value})", inline=True)
+
+        try:
+            message = await ctx.send(embed=embed, view=self.open_buttons)
+        except discord.HTTPException:
+            self.db.credit(user_id, bet)
+            self.close(session)
+            raise
+        self.sessions.update(session, message_id=message.id)
+        self.arm(session)
@@ -0,0 +1,153 @@
+import random
+import logging
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from ..clock import get_now_utc7
+from ..economy import claim_daily, format_balance
+from .embeds import create_embed, reply_ephemeral
+
+log = logging.getLogger(__name__)
+
+# ===== ECONOMY COMMANDS =====
+class Economy(commands.Cog):
+    def __init__(self, app):
+        self.db = app.db
+        self.identity = app.identity
+        self.prepare = app.prepare_interaction
+
+    # ----- daily / money, shared by the prefix and slash commands -----
+    def daily_embed(self, author):
+        user = self.db.get_user(str(author.id))
+        if not user:
+            user = self.db.create_user(str(author.id), author.name)
+
+        now = get_now_utc7()
+        claim = claim_daily(user, now)
+        if claim is None:
+            return create_embed("❌ Lỗi", "Bạn đã nhận thưởng hôm nay rồi!", 0xff0000)
+        streak, reward = claim
+
+        self.db.update_user(str(author.id), daily_streak=streak, last_daily=now)
+        self.db.credit(str(author.id), reward)
+
+        log.debug("🎁 daily user=%s streak=%d reward=%d", author.name, streak, reward)
+        return create_embed("📅 Điểm danh hàng ngày", f"✨ Chúc mừng **{author.name}**!\n💰 Phần thưởng: **{reward:,}** cash\n🔥 Chuỗi hiện tại: **{streak} ngày**\n\n*Hãy quay lại vào ngày mai nhé!*", 0x00ff00, thumbnail=author.display_avatar.url)
+
+    async def money_embed(self, author):
+        user = self.db.get_user(str(author.id))
+        if not user:
+            user = self.db.create_user(str(author.id), author.name)
+        rank = await self.db.fetch_rank(str(author.id))
+        return create_embed("💰 Tài khoản cá nhân", f"👤 Người sở hữu: **{author.name}**\n💵 Số dư: **{format_balance(user.balance, user.unlimited)}**\n\n🏆 Hạng hiện tại: **#{rank:,}**", 0xffff00, thumbnail=author.display_avatar.url)
+
+    @commands.command()
+    async def daily(self, ctx):
+        await ctx.reply(embed=self.daily_embed(ctx.author))
+
+    @commands.command(aliases=["cash"])
+    async def money(self, ctx):
+        await ctx.reply(embed=await self.money_embed(ctx.author))
+
+    @app_commands.command(name="daily", description="Nhận thưởng điểm danh hàng ngày")
+    async def slash_daily(self, interaction: discord.Interaction):
+        async with self.prepare(interaction):
+            await reply_ephemeral(interaction, self.daily_embed(interaction.user))
+
+    @app_commands.command(name="money", description="Xem số dư và thứ hạng của bạn")
+    async def slash_money(self, interaction: discord.Interaction):
+        async with self.prepare(interaction):
+            await reply_ephemeral(interaction, await self.money_embed(interaction.user))
+
+    @commands.command()
+    async def top(self, ctx):
+        top_users = await self.db.fetch_top(10)
+        description = "🏆 **Bảng Xếp Hạng Đại Gia** 🏆\n\n"
+        description += "\n".join([f"{i+1}. 👤 **{self.identity.name(uid, u.username)}**: `{format_balance(u.balance, u.unlimited)}`" for i, (uid, u) in enumerate(top_users)])
+        await ctx.send(embed=create_embed("🏆 Top 10 Bảng Xếp Hạng", description, 0xffd700))
+
+    @commands.command()
+    async def give(self, ctx, member: discord.Member, amount: int):
+        if amount <= 0:
+            await ctx.reply("❌ Số tiền không hợp lệ.")
+            return
+
+        sender = self.db.get_user(str(ctx.author.id))
+        if not sender:
+            await ctx.reply("❌ Bạn không đủ tiền!")
+            return
+
+        if not self.db.get_user(str(member.id)):
+            self.db.create_user(str(member.id), member.name)
+
+        if not await self.db.transfer_async(str(ctx.author.id), str(member.id), amount):
+            await ctx.reply("❌ Bạn không đủ tiền!")
+            return
+
+        log.debug("💸 give from=%s to=%s amount=%d", ctx.author.name, member.name, amount)
+        await ctx.reply(embed=create_embed("✅ Chuyển tiền thành công", f"👤 Từ: **{ctx.author.name}**\n👤 Đến: **{member.name}**\n💰 Số tiền: **{amount:,}** cash", 0x00ff00, thumbnail=ctx.author.display_avatar.url))
+
+    @commands.command(aliases=["pf", "info"])
+    async def profile(self, ctx, member: discord.Member = None):
+        target = member or ctx.author
+        user = self.db.get_user(str(target.id))
+        if not user:
+            user = self.db.create_user(str(target.id), target.name)
+
+        married_id = user.married_to
+        married_text = "Chưa kết hôn"
+        if married_id:
+            try:
+                married_user = await self.identity.resolve(married_id)
+                ring_id = user.ring
+                ring_text = ""
+                if ring_id and ring_id in RINGS:
+                    ring_text = f" (💍 {RINGS[ring_id]['name']})"
+                married_text = f"💍 Đã kết hôn với **{married_user.name}**{ring_text}"
+            except:
+                married_text = "💍 Đã kết hôn"
+
+        rank = await self.db.fetch_rank(str(target.id))
+        desc = (
+            f"💵 Số dư: **{format_balance(user.balance, user.unlimited)}**\n"
+            f"🏆 Hạng: **#{rank:,}**\n"
+            f"🔥 Chuỗi điểm danh: **{user.daily_streak}** ngày\n"
+            f"{married_text}\n\n"
+            f"📊 **Thống kê chơi game:**\n"
+            f"✅ Thắng: **{user.wins}**\n"
+            f"❌ Thua: **{user.losses}**\n"
+            f"💰 Tổng cược: **{user.total_bet:,}** cash"
+        )
+
+        await ctx.reply(embed=create_embed(f"👤 Hồ sơ của {target.name}", desc, 0x00aaff, thumbnail=target.display_avatar.url))
+
+    @commands.command()
+    async def steal(self, ctx, member: discord.Member):
+        if member.id == ctx.author.id:
+            return await ctx.reply("❌ Bạn không thể tự trộm chính mình!")
+
+        stealer_data = self.db.get_user(str(ctx.author.id))
+        target_data = self.db.get_user(str(member.id))
+
+        if not stealer_data: stealer_data = self.db.create_user(str(ctx.author.id), ctx.author.name)
+        if not target_data: target_data = self.db.create_user(str(member.id), member.name)
+
+        if not target_data.unlimited and target_data.balance == 0:
+            return await ctx.reply("❌ Đối phương không có tiền để trộm!")
+
+        chance = random.random()
+        if chance <= 0.01:
+            if target_data.unlimited:
+                stolen_amount = 999999999999
+                self.db.credit(str(ctx.author.id), stolen_amount)
+                self.db.update_user(str(member.id), unlimited=False, balance=0)
+            else:
+                stolen_amount = target_data.balance
+                await self.db.transfer_async(str(member.id), str(ctx.author.id), stolen_amount)
+            await ctx.reply(embed=create_embed("🥷 TRỘM THÀNH CÔNG!", f"😱 Bạn đã trộm thành công **{format_balance(stolen_amount)}** từ **{member.name}**!", 0x00ff00, thumbnail=ctx.author.display_avatar.url))
+        else:
+            penalty = 0 if stealer_data.unlimited else int(stealer_data.balance * 0.5)
+            await self.db.debit_async(str(ctx.author.id), penalty)
+            await ctx.reply(embed=create_embed("👮 TRỘM THẤT BẠI!", f"🚔 Bạn đã bị bắt! Phạt **50%** tài sản (**{penalty:,}** cash).", 0xff0000, thumbnail=ctx.author.display_avatar.url))
@@ -0,0 +1,18 @@
+import discord
+
+from ..clock import get_now_utc7
+
+def create_embed(title, description, color=0x0099ff, thumbnail=None):
+    embed = discord.Embed(title=title, description=description, color=color)
+    embed.timestamp = get_now_utc7()
+    if thumbnail:
+        embed.set_thumbnail(url=thumbnail)
+    return embed
+
+# Seen only by the user who clicked or ran the command; once the response
+# was deferred it goes out as a followup
+async def reply_ephemeral(interaction, embed):
+    if interaction.response.is_done():
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    else:
+        await interaction.response.send_message(embed=embed, ephemeral=True)
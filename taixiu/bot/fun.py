@@ -0,0 +1,67 @@
+import random
+
+import discord
+from discord.ext import commands
+
+from .embeds import create_embed
+
+HELP_TEXT = (
+    "🎮 **Lệnh Trò Chơi**\n"
+    "`?tx`: Bắt đầu ván Tài Xỉu\n"
+    "`?cuoc <tai|xiu> <amount>`: Đặt cược\n"
+    "`?txstop`: Dừng ván game hiện tại\n"
+    "`?txtt`: Bật/Tắt chế độ tự động bắt đầu\n"
+    "🔘 Hoặc bấm **Tài** / **Xỉu** trên thông báo ván đấu\n\n"
+    "💰 **Lệnh Kinh Tế**\n"
+    "`?daily`: Nhận thưởng hàng ngày\n"
+    "`?money`: Xem số dư hiện có\n"
+    "`/cuoc`, `/daily`, `/money`: Như trên, chỉ bạn thấy phản hồi\n"
+    "`?top`: Xem bảng xếp hạng đại gia\n"
+    "`?give @user <amount>`: Chuyển tiền cho bạn bè\n"
+    "`?pf`: Xem hồ sơ cá nhân\n"
+    "`?steal @user`: Thử vận may trộm tiền\n\n"
+    "💍 **Hôn Nhân**\n"
+    "`?marry @user`: Cầu hôn\n"
+    "`?marry accept/decline`: Chấp nhận/Từ chối\n"
+    "`?marry shop`: Cửa hàng nhẫn\n"
+    "`?marry buy <id>`: Mua nhẫn\n"
+    "`?marry give ring <id>`: Tặng nhẫn cho vợ/chồng\n"
+    "`?divorce @user`: Ly hôn\n\n"
+    "🎟️ **Xổ Số**\n"
+    "`?lott`: Xem thông tin xổ số\n"
+    "`?lott buy [số vé]`: Mua vé (50k/vé)\n"
+    "`?lott shop`: Xem cửa hàng vé số\n\n"
+    "🎰 **Trò Chơi Khác**\n"
+    "`?blackjack <amount>`: Chơi Blackjack\n"
+    "`?coinflip <1|2> <amount>`: Tung đồng xu\n"
+    "`?slots <amount>`: Quay Slot\n"
+)
+
+# ===== HELP & FUN COMMANDS =====
+class Fun(commands.Cog):
+    def __init__(self, app):
+        pass
+
+    @commands.command(name="help")
+    async def help_cmd(self, ctx):
+        await ctx.send(embed=create_embed("📜 Danh Sách Lệnh TaixiuBot", HELP_TEXT, 0x0099ff))
+
+    @commands.command()
+    async def ok(self, ctx, member: discord.Member):
+        await ctx.send(f"{ctx.author.mention} giơ ngón cái với {member.mention} 👍")
+
+    @commands.command()
+    async def cc(self, ctx, member: discord.Member):
+        insults = [
+            "địt mẹ mày con chó", "loz cek dcm", "đồ óc chó", "cút mẹ mày đi",
+            "mày là cái thá gì", "ăn cức đi con"
+        ]
+        await ctx.send(f"{member.mention} {random.choice(insults)}")
+
+    @commands.command()
+    async def fuck(self, ctx, member: discord.Member):
+        actions = [
+            "đang làm gì đó mờ ám với", "đang thông đít", "đang hành hạ",
+            "đang ôm ấp nồng cháy với"
+        ]
+        await ctx.send(f"{ctx.author.mention} {random.choice(actions)} {member.mention} 🔞")
@@ -0,0 +1,106 @@
+import logging
+from datetime import timedelta
+
+import discord
+from discord.ext import commands
+
+from ..clock import get_now_utc7
+from ..economy import LOTTERY_PRICE, MAX_TICKETS_PER_BUY, LOTTERY_WINNERS, lottery_prizes
+from ..outbox import PRIORITY_RESULT
+from .embeds import create_embed
+
+log = logging.getLogger(__name__)
+
+# ===== LOTTERY SYSTEM =====
+class Lottery(commands.Cog):
+    def __init__(self, app):
+        self.bot = app.bot
+        self.db = app.db
+        self.outbox = app.outbox
+        self.channel_id = app.config.lottery_channel_id
+        self.store = app.lottery_store
+        self.scheduler = app.scheduler
+        # With shards split over processes, only one of them draws
+        self.draws = app.config.owns_global_tasks
+
+    # Dispatched by App.load once both stores are in memory; a deadline that
+    # passed while the bot was down fires right away
+    @commands.Cog.listener()
+    async def on_stores_loaded(self):
+        self.arm()
+
+    def end_time(self):
+        # Opens the first round lazily, like the old lott.json did
+        if self.store.end_time is None:
+            self.store.set_end_time(get_now_utc7() + timedelta(days=1))
+            self.arm()
+        return self.store.end_time
+
+    def arm(self):
+        if self.draws and self.store.end_time is not None:
+            self.scheduler.schedule("lottery", self.store.end_time, self.draw)
+
+    @commands.group(aliases=["lott"], invoke_without_command=True)
+    async def lottery(self, ctx):
+        remaining = self.end_time() - get_now_utc7()
+        mine = self.store.user_ticket_count(str(ctx.author.id))
+
+        desc = f"🎟️ Tổng số vé đã mua: **{self.store.ticket_count:,}**\n🙋 Vé của bạn: **{mine:,}**\n⏰ Thời gian còn lại: **{str(remaining).split('.')[0]}**\n💰 Giá vé: **{LOTTERY_PRICE:,}** cash\n\nSử dụng `?lott buy [số vé]` để mua vé!"
+        await ctx.reply(embed=create_embed("🎫 XỔ SỐ KIẾN THIẾT", desc, 0xffaa00))
+
+    @lottery.command(name="buy")
+    async def buy_tickets(self, ctx, count: int = 1):
+        if count < 1 or count > MAX_TICKETS_PER_BUY:
+            return await ctx.reply(f"❌ Số vé phải từ 1 đến {MAX_TICKETS_PER_BUY:,}!")
+        cost = LOTTERY_PRICE * count
+        if await self.db.debit_async(str(ctx.author.id), cost) is None:
+            return await ctx.reply(f"❌ Bạn không đủ {cost:,} cash để mua {count:,} vé!")
+
+        remaining = self.end_time() - get_now_utc7()
+        ticket_ids = self.store.buy(str(ctx.author.id), count)
+
+        if count == 1:
+            bought = f"vé **{ticket_ids[0]}**"
+        else:
+            shown = ", ".join(ticket_ids[:5]) + (", ..." if count > 5 else "")
+            bought = f"**{count:,}** vé ({shown})"
+        await ctx.reply(embed=create_embed("🎫 MUA VÉ THÀNH CÔNG", f"✅ Bạn đã mua {bought} với giá **{cost:,}** cash!\n⏰ Kết quả sẽ có sau **{str(remaining).split('.')[0]}**", 0x00ff00))
+
+    @lottery.command(name="shop")
+    async def ticket_shop(self, ctx):
+        desc = f"🏪 **Cửa Hàng Vé Số**\n\n🎟️ Vé số may mắn: **{LOTTERY_PRICE:,}** cash / vé\n🍀 Cơ hội trúng giải thưởng lên đến **1,000 tỷ**!\n\nSử dụng `?lott buy [số vé]` để mua ngay!"
+        await ctx.reply(embed=create_embed("🎫 LOTTERY SHOP", desc, 0xffaa00))
+
+    async def draw(self):
+        next_end = get_now_utc7() + timedelta(days=1)
+        if not self.store.ticket_count:
+            # Nobody bought a ticket; just open the next round
+            self.store.set_end_time(next_end)
+            self.arm()
+            return
+
+        # Draws and opens the next round as one step, so no ticket bought
+        # meanwhile (possibly by another process) falls between the two
+        winners = await self.store.draw_round(LOTTERY_WINNERS, next_end)
+
+        desc = "🎊 **KẾT QUẢ XỔ SỐ ĐÃ CÓ!** 🎊\n\n"
+
+        await self.db.prefetch(*(user_id for _, user_id in winners))
+        for i, ((ticket_id, user_id), reward) in enumerate(zip(winners, lottery_prizes(len(winners)))):
+            if self.db.credit(user_id, reward) is not None:
+                desc += f"{i+1}. **{ticket_id}**: `{reward:,}` Cash (<@{user_id}>)\n"
+
+        # Fold the finished round into a fresh lott.json
+        self.arm()
+        await self.store.flush_async(compact=True)
+        log.info("🎰 Lottery resolved winners=%d", len(winners))
+        await self.announce(create_embed("🎫 XỔ SỐ KIẾN THIẾT", desc, 0xffaa00))
+
+    async def announce(self, embed):
+        if self.channel_id is None:
+            return
+        try:
+            channel = self.bot.get_channel(self.channel_id) or await self.bot.fetch_channel(self.channel_id)
+            self.outbox.send(channel, PRIORITY_RESULT, embed=embed)
+        except discord.HTTPException as e:
+            log.warning("⚠️ Could not post lottery results to %s: %s", self.channel_id, e)
@@ -0,0 +1,110 @@
+import discord
+from discord.ext import commands
+
+from .embeds import create_embed
+
+# ===== MARRIAGE SYSTEM =====
+class Marriage(commands.Cog):
+    def __init__(self, app):
+        self.db = app.db
+        self.identity = app.identity
+        # invitee id -> proposer id
+        self.invites = {}
+
+    @commands.group(invoke_without_command=True)
+    async def marry(self, ctx, member: discord.Member):
+        if member.id == ctx.author.id:
+            return await ctx.reply("❌ Bạn không thể tự cưới chính mình!")
+
+        user_data = self.db.get_user(str(ctx.author.id))
+        target_data = self.db.get_user(str(member.id))
+
+        if user_data and user_data.married_to:
+            return await ctx.reply("❌ Bạn đã kết hôn rồi!")
+        if target_data and target_data.married_to:
+            return await ctx.reply("❌ Đối phương đã kết hôn rồi!")
+
+        self.invites[str(member.id)] = str(ctx.author.id)
+        await ctx.send(f"{member.mention}", embed=create_embed("💍 LỜI CẦU HÔN", f"❤️ **{ctx.author.name}** đã ngỏ lời cầu hôn với bạn!\n\nSử dụng `?marry accept @{ctx.author.name}` để đồng ý hoặc `?marry decline @{ctx.author.name}` để từ chối.", 0xff69b4, thumbnail=ctx.author.display_avatar.url))
+
+    @marry.command()
+    async def accept(self, ctx, member: discord.Member):
+        if str(ctx.author.id) in self.invites and self.invites[str(ctx.author.id)] == str(member.id):
+            self.db.update_user(str(ctx.author.id), married_to=str(member.id))
+            self.db.update_user(str(member.id), married_to=str(ctx.author.id))
+            del self.invites[str(ctx.author.id)]
+            await ctx.send(embed=create_embed("🎉 CHÚC MỪNG ĐÁM CƯỚI!", f"🥂 **{ctx.author.name}** và **{member.name}** đã chính thức về chung một nhà!\n✨ Cả hai sẽ được **1.5x** thưởng điểm danh hàng ngày!", 0xff69b4, thumbnail=ctx.author.display_avatar.url))
+        else:
+            await ctx.reply("❌ Bạn không có lời mời kết hôn nào từ người này!")
+
+    @marry.command()
+    async def decline(self, ctx, member: discord.Member):
+        if str(ctx.author.id) in self.invites and self.invites[str(ctx.author.id)] == str(member.id):
+            del self.invites[str(ctx.author.id)]
+            await ctx.reply(f"💔 Bạn đã từ chối lời cầu hôn của **{member.name}**.")
+        else:
+            await ctx.reply("❌ Bạn không có lời mời kết hôn nào từ người này!")
+
+    @marry.command(name="shop")
+    async def ring_shop(self, ctx):
+        desc = "💍 **Cửa hàng Nhẫn Cưới**\n\n"
+        for k, v in RINGS.items():
+            desc += f"{k}. **{v['name']}**: {v['price']:,} cash\n*{v['desc']}*\n\n"
+        desc += "Sử dụng `?marry buy <số>` để mua nhẫn!"
+        await ctx.reply(embed=create_embed("💍 RING SHOP", desc, 0xff69b4))
+
+    @marry.command(name="buy")
+    async def buy_ring(self, ctx, ring_id: str):
+        if ring_id not in RINGS:
+            return await ctx.reply("❌ ID nhẫn không hợp lệ!")
+
+        user = self.db.get_user(str(ctx.author.id))
+        if not user: user = self.db.create_user(str(ctx.author.id), ctx.author.name)
+
+        ring = RINGS[ring_id]
+        if await self.db.debit_async(str(ctx.author.id), ring['price']) is None:
+            return await ctx.reply("❌ Bạn không đủ tiền để mua nhẫn này!")
+
+        inventory = user.inventory
+        inventory.append(ring_id)
+        self.db.update_user(str(ctx.author.id), inventory=inventory)
+
+        await ctx.reply(embed=create_embed("💍 MUA NHẪN THÀNH CÔNG", f"✅ Bạn đã mua **{ring['name']}**!\nDùng `?marry give ring {ring_id}` để tặng cho bạn đời.", 0x00ff00))
+
+    @marry.command(name="give")
+    async def give_ring(self, ctx, type_str: str, ring_id: str):
+        if type_str.lower() != "ring": return
+
+        user = self.db.get_user(str(ctx.author.id))
+        if not user or not user.married_to:
+            return await ctx.reply("❌ Bạn cần phải kết hôn để tặng nhẫn!")
+
+        inventory = user.inventory
+        if ring_id not in inventory:
+            return await ctx.reply("❌ Bạn không sở hữu nhẫn này trong kho!")
+
+        partner_id = user.married_to
+        await self.db.prefetch(partner_id)
+        partner = self.db.get_user(partner_id)
+
+        # Remove from inventory and set as current ring for partner
+        inventory.remove(ring_id)
+        self.db.update_user(str(ctx.author.id), inventory=inventory)
+        self.db.update_user(partner_id, ring=ring_id)
+
+        ring = RINGS[ring_id]
+        partner_user = await self.identity.resolve(partner_id)
+        partner_name = partner_user.name if partner_user else (partner.username if partner else partner_id)
+        thumbnail = partner_user.display_avatar.url if partner_user else None
+
+        await ctx.send(embed=create_embed("🎁 TẶNG QUÀ KẾT HÔN", f"❤️ **{ctx.author.name}** đã tặng **{ring['name']}** cho **{partner_name}**!\n✨ *{ring['desc']}*", 0xff69b4, thumbnail=thumbnail))
+
+    @commands.command()
+    async def divorce(self, ctx, member: discord.Member):
+        user_data = self.db.get_user(str(ctx.author.id))
+        if user_data and user_data.married_to == str(member.id):
+            self.db.update_user(str(ctx.author.id), married_to=None, ring=None)
+            self.db.update_user(str(member.id), married_to=None, ring=None)
+            await ctx.reply(embed=create_embed("💔 LY HÔN", f"😢 **{ctx.author.name}** và **{member.name}** đã chính thức ly hôn. Tiền thưởng hàng ngày trở lại **1x**.", 0x555555))
+        else:
+            await ctx.reply("❌ Bạn không kết hôn với người này!")
@@ -0,0 +1,197 @@
+import time
+import asyncio
+import logging
+from datetime import timedelta
+
+from .. import metrics
+from ..clock import get_now_utc7
+from ..games.taixiu import (GameRegistry, ROUND_SECONDS, RESTART_DELAY, IDLE, BETTING, ROLLING, SETTLING, COOLDOWN,
+                            roll_dice, result_of, settle)
+from ..outbox import BetBoard, PRIORITY_RESULT, PRIORITY_ANNOUNCE
+from .embeds import create_embed
+
+log = logging.getLogger(__name__)
+
+BOARD_LINES = 20
+
+def render_bet_board(bets):
+    totals = {"tai": 0, "xiu": 0}
+    for bet in bets:
+        totals[bet['choice']] += bet['amount']
+    lines = [f"👤 **{b['username']}**: {b['amount']:,} → **{b['choice'].upper()}**" for b in bets[-BOARD_LINES:]]
+    if len(bets) > BOARD_LINES:
+        lines.insert(0, f"... và {len(bets) - BOARD_LINES} lượt cược khác")
+    desc = (
+        f"🔴 TÀI: **{totals['tai']:,}** cash\n"
+        f"⚪ XỈU: **{totals['xiu']:,}** cash\n\n"
+        + "\n".join(lines)
+    )
+    return create_embed(f"📋 BẢNG CƯỢC ({len(bets)} lượt)", desc, 0x00aaff)
+
+# DMs (no guild) always arrive on shard 0
+def shard_of(channel):
+    guild = getattr(channel, "guild", None)
+    return guild.shard_id if guild is not None else 0
+
+# ===== ROUNDS =====
+# Each channel's game is one long-lived task looping through the phases in
+# games.taixiu: rounds follow each other inside the loop instead of every
+# round starting the next, so an auto-restarted channel holds the same state
+# and a single task for as long as it runs, and stopping it is one cancel.
+# The rules themselves live in games.taixiu.
+class RoundManager:
+    def __init__(self, db, outbox, bet_board=True, coordinator=None):
+        self.db = db
+        self.outbox = outbox
+        self.bet_board = bet_board
+        # With several processes, a channel's loop runs in the one that
+        # claimed it from the coordinator
+        self.coordinator = coordinator
+        # Tài/Xỉu buttons put on every round announcement, set by the TaiXiu cog
+        self.announce_view = None
+        self.games = GameRegistry()
+
+    # Opens a round, or skips the cooldown when auto-restart is between
+    # rounds. False if another process owns the channel's game.
+    async def start_game(self, channel):
+        game = self.games.get_or_create(channel.id, shard_of(channel))
+        if game.task is None and self.coordinator is not None:
+            if not await self.coordinator.request("claim_round", channel=channel.id):
+                self.games.release(game)
+                return False
+        if game.task is not None:
+            if game.phase == COOLDOWN:
+                game.wakeup.set()
+            return True
+        # The first round opens here so ?cuoc works as soon as this returns
+        self.open_round(channel, game)
+        game.task = asyncio.create_task(self.run(channel, game))
+        return True
+
+    # Ends the betting now (?txstop / ?win) and waits until the round is settled
+    async def end_game(self, channel, forced_result=None):
+        game = self.games.get(channel.id)
+        if not game or not game.accepting_bets:
+            return
+        game.forced_result = forced_result
+        game.wakeup.set()
+        # Shielded: a cancelled command must not cancel the round
+        await asyncio.shield(game.round_over)
+
+    # Stops the channel for good: the round in progress is still settled,
+    # a cooldown ends at once. Returns False if nothing was running.
+    async def stop_game(self, channel):
+        game = self.games.get(channel.id)
+        if not game or game.task is None:
+            return False
+        game.auto_restart = False
+        if game.accepting_bets:
+            await self.end_game(channel)
+        else:
+            game.wakeup.set()
+        return True
+
+    # Cancels every channel's loop, e.g. before the stores are flushed on shutdown
+    async def close(self):
+        tasks = [game.task for game in self.games.games.values() if game.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def open_round(self, channel, game):
+        game.phase = BETTING
+        game.end_time = get_now_utc7() + timedelta(seconds=ROUND_SECONDS)
+        game.bets = []
+        game.forced_result = None
+        game.round_over = asyncio.get_running_loop().create_future()
+        game.wakeup.clear()
+        # Bound to this round's bet list, which the next round replaces
+        game.board = BetBoard(self.outbox, channel, lambda bets=game.bets: render_bet_board(bets)) if self.bet_board else None
+
+        self.outbox.send(channel, PRIORITY_ANNOUNCE, view=self.announce_view, embed=create_embed(
+            "🎲 GAME TÀI XỈU BẮT ĐẦU!",
+            f"⏳ Thời gian cược: **{ROUND_SECONDS} giây**\n\n📢 Bấm **Tài** / **Xỉu** bên dưới hoặc dùng `/cuoc` để tham gia.\n💰 Đừng quên nhận `/daily` mỗi ngày!",
+            0x00ff00
+        ))
+
+    # Sleeps up to `seconds`, or less if the game's wakeup is set
+    async def wait(self, game, seconds):
+        try:
+            await asyncio.wait_for(game.wakeup.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, channel, game):
+        try:
+            while True:
+                await self.wait(game, ROUND_SECONDS)
+                game.phase = ROLLING
+                # Bettors' rows may have been evicted from the cache since
+                await self.db.prefetch(*{bet['user_id'] for bet in game.bets})
+                dice = roll_dice()
+                result = game.forced_result or result_of(dice)
+                game.phase = SETTLING
+                self.settle_round(channel, game, dice, result)
+                # Leaving the loop resolves round_over only once the game is
+                # idle, so a ?tx right after ?txstop starts a fresh loop
+                if not game.auto_restart:
+                    break
+                game.round_over.set_result(None)
+                game.phase = COOLDOWN
+                game.wakeup.clear()
+                self.outbox.send(channel, PRIORITY_ANNOUNCE, embed=create_embed("🔄 Auto Restart", f"✨ Ván đấu mới sẽ tự động bắt đầu sau **{RESTART_DELAY} giây**...", 0xffff00))
+                await self.wait(game, RESTART_DELAY)
+                # ?txtt off / ?txstop during the cooldown
+                if not game.auto_restart:
+                    break
+                self.open_round(channel, game)
+        except Exception:
+            log.exception("❌ Round loop failed channel=%s", channel.id)
+        finally:
+            # Cancelled before the round was settled (shutdown): stakes go back
+            if game.phase in (BETTING, ROLLING) and game.bets:
+                await self.refund(game)
+            if game.board:
+                game.board.close()
+                game.board = None
+            if game.round_over is not None and not game.round_over.done():
+                game.round_over.set_result(None)
+            game.phase = IDLE
+            game.bets = []
+            game.task = None
+            self.games.release(game)
+            if self.coordinator is not None and not self.coordinator.closed:
+                self.coordinator.send("release_round", channel=channel.id)
+
+    async def refund(self, game):
+        await self.db.prefetch(*{bet['user_id'] for bet in game.bets})
+        changes = {}
+        for bet in game.bets:
+            if self.db.get_user(bet['user_id']):
+                changes.setdefault(bet['user_id'], {"balance": 0})["balance"] += bet['amount']
+        self.db.apply_batch(changes)
+        log.info("↩️ Refunded %d bets of an unfinished round channel=%s", len(game.bets), game.channel_id)
+
+    def settle_round(self, channel, game, dice, result):
+        total = sum(dice)
+        result_emoji = "🔴 TÀI" if result == "tai" else "⚪ XỈU"
+        description = f"🎲 Kết quả: **{dice[0]} - {dice[1]} - {dice[2]}** (Tổng: {total})\n🏆 Chiến thắng: **{result_emoji}**\n\n"
+
+        settle_start = time.perf_counter()
+        changes, winners, losers = settle(game.bets, result, self.db)
+        self.db.apply_batch(changes)
+        metrics.SETTLE_SECONDS.observe(time.perf_counter() - settle_start)
+
+        if winners:
+            description += f"🎉 **Người thắng:**\n" + "\n".join(f"👤 **{b['username']}**: +{b['amount']:,} cash" for b in winners) + "\n\n"
+        else:
+            description += "😢 **Không có người thắng.**\n\n"
+
+        if losers:
+            description += f"💀 **Người thua:**\n" + "\n".join(f"👤 **{b['username']}**: -{b['amount']:,} cash" for b in losers)
+
+        if game.board:
+            game.board.close()
+            game.board = None
+        self.outbox.send(channel, PRIORITY_RESULT, embed=create_embed("🏁 KẾT THÚC GAME TÀI XỈU", description, 0xff0000 if result == "tai" else 0xeeeeee))
+        game.bets = []
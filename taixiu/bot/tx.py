@@ -0,0 +1,224 @@
+import logging
+
+import discord
+from discord import app_commands, ui
+from discord.ext import commands
+
+from .. import metrics
+from ..games.taixiu import CHOICES, COOLDOWN
+from .embeds import create_embed, reply_ephemeral
+from .rounds import shard_of
+
+log = logging.getLogger(__name__)
+
+# One instance serves the buttons of every round announcement: the
+# custom_ids are fixed and the round is looked up by channel, so the view
+# is registered once and keeps working after a restart
+class BetView(ui.View):
+    def __init__(self, cog):
+        super().__init__(timeout=None)
+        self.cog = cog
+
+    @ui.button(label="Tài", style=discord.ButtonStyle.red, emoji="🔴", custom_id="taixiu:tai")
+    async def tai(self, interaction: discord.Interaction, button: ui.Button):
+        await self.cog.on_bet_button(interaction, "tai")
+
+    @ui.button(label="Xỉu", style=discord.ButtonStyle.grey, emoji="⚪", custom_id="taixiu:xiu")
+    async def xiu(self, interaction: discord.Interaction, button: ui.Button):
+        await self.cog.on_bet_button(interaction, "xiu")
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception, item: ui.Item):
+        await self.cog.interaction_error(interaction, error)
+
+class BetModal(ui.Modal):
+    amount = ui.TextInput(label="Số tiền cược", placeholder="Ví dụ: 10000 hoặc all", max_length=20)
+
+    def __init__(self, cog, choice):
+        super().__init__(title=f"Đặt cược {choice.upper()}", custom_id=f"taixiu:bet:{choice}")
+        self.cog = cog
+        self.choice = choice
+
+    async def on_submit(self, interaction: discord.Interaction):
+        await self.cog.bet_from_interaction(interaction, self.choice, self.amount.value)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception):
+        await self.cog.interaction_error(interaction, error)
+
+# ===== TAI XIU COMMANDS =====
+class TaiXiu(commands.Cog):
+    def __init__(self, app):
+        self.bot = app.bot
+        self.db = app.db
+        self.outbox = app.outbox
+        self.rounds = app.rounds
+        self.is_loading = app.is_loading
+        self.prepare = app.prepare_interaction
+        self.interaction_error = app.on_interaction_error
+        # Registered once, handles the clicks on every announcement
+        self.view = BetView(self)
+        # What round announcements carry: a stopped copy is only components,
+        # so discord.py keeps nothing per message for it
+        buttons = BetView(self)
+        buttons.stop()
+        self.rounds.announce_view = buttons
+
+    async def cog_load(self):
+        self.bot.add_view(self.view)
+
+    # ----- game control -----
+    # Shared by the ?commands and their slash versions. Each returns the embed
+    # to reply with, or None when the round's own announcement says it all.
+    async def start_round(self, channel, author):
+        if self.rounds.games.is_running(channel.id) or not await self.rounds.start_game(channel):
+            return create_embed("❌ Lỗi", "Game đang diễn ra!", 0xff0000)
+        log.info("🎲 @%s started a new game channel=%s", author.name, channel.id)
+        return None
+
+    async def stop_round(self, channel, author):
+        # Also ends auto-restart, including a cooldown between rounds
+        game = self.rounds.games.get(channel.id)
+        had_round = game is not None and game.is_running
+        if not await self.rounds.stop_game(channel):
+            return create_embed("❌ Lỗi", "Không có game nào đang diễn ra!", 0xff0000)
+        log.info("🛑 @%s stopped the game channel=%s", author.name, channel.id)
+        # A settled round already announced itself with its result
+        if had_round:
+            return None
+        return create_embed("🛑 Đã dừng", "Ván đấu tiếp theo đã bị hủy, chế độ Auto Restart đã **TẮT**.", 0xff0000)
+
+    async def toggle_auto_restart(self, channel, author):
+        game = self.rounds.games.get_or_create(channel.id, shard_of(channel))
+        game.auto_restart = not game.auto_restart
+        if game.auto_restart and game.task is None and not await self.rounds.start_game(channel):
+            # The channel's game runs in another process
+            game.auto_restart = False
+            self.rounds.games.release(game)
+            return create_embed("❌ Lỗi", "Game đang diễn ra!", 0xff0000)
+        status = "**BẬT**" if game.auto_restart else "**TẮT**"
+        color = 0x00ff00 if game.auto_restart else 0xff0000
+        log.info("🔄 @%s toggled auto-restart: %s", author.name, game.auto_restart)
+        if not game.auto_restart and game.phase == COOLDOWN:
+            # No next round is coming, so the cooldown ends now
+            game.wakeup.set()
+        self.rounds.games.release(game)
+        return create_embed("🔄 Chế độ Auto Restart", f"Chế độ tự động bắt đầu game mới đã: {status}", color)
+
+    @commands.command()
+    async def tx(self, ctx):
+        embed = await self.start_round(ctx.channel, ctx.author)
+        if embed:
+            await ctx.reply(embed=embed)
+
+    @commands.command()
+    async def txstop(self, ctx):
+        embed = await self.stop_round(ctx.channel, ctx.author)
+        if embed:
+            await ctx.reply(embed=embed)
+
+    @commands.command()
+    async def txtt(self, ctx):
+        await ctx.reply(embed=await self.toggle_auto_restart(ctx.channel, ctx.author))
+
+    # Without PREFIX_COMMANDS these are the only way to run rounds in a guild
+    @app_commands.command(name="tx", description="Bắt đầu ván Tài Xỉu mới trong kênh này")
+    async def slash_tx(self, interaction: discord.Interaction):
+        async with self.prepare(interaction):
+            embed = await self.start_round(interaction.channel, interaction.user)
+            await reply_ephemeral(interaction, embed or create_embed("🎲 Tài Xỉu", "Ván đấu mới đã bắt đầu!", 0x00ff00))
+
+    @app_commands.command(name="txstop", description="Dừng ván Tài Xỉu và tắt Auto Restart")
+    async def slash_txstop(self, interaction: discord.Interaction):
+        async with self.prepare(interaction):
+            embed = await self.stop_round(interaction.channel, interaction.user)
+            await reply_ephemeral(interaction, embed or create_embed("🛑 Đã dừng", "Ván đấu đã được dừng, chế độ Auto Restart đã **TẮT**.", 0xff0000))
+
+    @app_commands.command(name="txtt", description="Bật/tắt chế độ tự động bắt đầu ván mới")
+    async def slash_txtt(self, interaction: discord.Interaction):
+        async with self.prepare(interaction):
+            await reply_ephemeral(interaction, await self.toggle_auto_restart(interaction.channel, interaction.user))
+
+    # ----- betting -----
+    # Shared by ?cuoc, /cuoc and the buttons. Returns (placed, embed to show)
+    async def place_bet(self, channel_id, author, choice, amount):
+        game = self.rounds.games.get(channel_id)
+        if not game or not game.accepting_bets:
+            return False, create_embed("❌ Lỗi", "Không có game nào đang diễn ra!", 0xff0000)
+
+        choice = choice.lower()
+        if choice not in CHOICES:
+            return False, create_embed("❌ Lỗi", "Vui lòng chọn `tai` hoặc `xiu`.", 0xff0000)
+
+        user = self.db.get_user(str(author.id))
+        if not user:
+            user = self.db.create_user(str(author.id), author.name)
+
+        amount = amount.strip()
+        if amount.lower() == "all":
+            if user.unlimited:
+                return False, create_embed("❌ Lỗi", "Bạn nhiều tiền đến nổi hệ thống bị ngu, deck đếm được số tiền này. Vui lòng thử lại với số tiền hợp lý!", 0xff0000)
+            bet_amount = user.balance
+        else:
+            try:
+                bet_amount = int(amount.replace(",", "").replace(".", ""))
+            except ValueError:
+                return False, create_embed("❌ Lỗi", "Số tiền không hợp lệ.", 0xff0000)
+
+        if bet_amount <= 0:
+            return False, create_embed("❌ Lỗi", "Số tiền phải lớn hơn 0.", 0xff0000)
+
+        if await self.db.debit_async(str(author.id), bet_amount) is None:
+            return False, create_embed("❌ Lỗi", f"Bạn không đủ tiền! Số dư hiện tại: **{user.balance:,}** cash", 0xff0000)
+        # The debit may have waited on the coordinator while the round closed
+        if self.rounds.games.get(channel_id) is not game or not game.accepting_bets:
+            self.db.credit(str(author.id), bet_amount)
+            return False, create_embed("❌ Lỗi", "Không có game nào đang diễn ra!", 0xff0000)
+
+        game.bets.append({
+            'user_id': str(author.id),
+            'username': author.name,
+            'amount': bet_amount,
+            'choice': choice
+        })
+        metrics.BETS.inc()
+        log.debug("💸 bet user=%s amount=%d choice=%s channel=%s", author.name, bet_amount, choice, channel_id)
+
+        if game.board:
+            game.board.touch()
+        return True, create_embed("✅ Đặt cược thành công", f"👤 Người chơi: **{author.name}**\n💰 Số tiền: **{bet_amount:,}** cash\n🎯 Lựa chọn: **{choice.upper()}**\n\n🍀 Chúc bạn may mắn!", 0x00ff00, thumbnail=author.display_avatar.url)
+
+    @commands.command()
+    async def cuoc(self, ctx, choice: str, amount: str):
+        placed, embed = await self.place_bet(ctx.channel.id, ctx.author, choice, amount)
+        if not placed:
+            await ctx.reply(embed=embed)
+            return
+        # The bet board lists it
+        if self.rounds.bet_board:
+            return
+        await self.outbox.send(ctx.channel, reference=ctx.message, embed=embed)
+
+    # Interaction replies are ephemeral: nothing is posted to the channel
+    # apart from the bet board
+    async def bet_from_interaction(self, interaction, choice, amount):
+        async with self.prepare(interaction):
+            _, embed = await self.place_bet(interaction.channel_id, interaction.user, choice, amount)
+            await reply_ephemeral(interaction, embed)
+
+    async def on_bet_button(self, interaction, choice):
+        # The modal has to be the first answer, so the click can't be
+        # deferred until the stores are loaded
+        if self.is_loading():
+            await reply_ephemeral(interaction, create_embed("⏳ Đang khởi động", "Bot đang tải dữ liệu, vui lòng thử lại sau giây lát.", 0xffff00))
+            return
+        async with self.prepare(interaction):
+            game = self.rounds.games.get(interaction.channel_id)
+            if not game or not game.accepting_bets:
+                await reply_ephemeral(interaction, create_embed("❌ Lỗi", "Không có game nào đang diễn ra!", 0xff0000))
+                return
+            await interaction.response.send_modal(BetModal(self, choice))
+
+    @app_commands.command(name="cuoc", description="Đặt cược vào ván Tài Xỉu đang diễn ra")
+    @app_commands.describe(choice="Tài hoặc Xỉu", amount="Số tiền cược, hoặc all")
+    @app_commands.choices(choice=[app_commands.Choice(name="Tài", value="tai"), app_commands.Choice(name="Xỉu", value="xiu")])
+    async def slash_cuoc(self, interaction: discord.Interaction, choice: app_commands.Choice[str], amount: str):
+        await self.bet_from_interaction(interaction, choice.value, amount)
@@ -0,0 +1,7 @@
+from datetime import datetime, timedelta, timezone
+
+# ===== TIMEZONE =====
+UTC7 = timezone(timedelta(hours=-7))
+
+def get_now_utc7():
+    return datetime.now(timezone.utc).astimezone(UTC7)
@@ -0,0 +1,163 @@
+import os
+
+# ===== PATHS =====
+# Local paths for development
+LOCAL_DATA_PATH = "data.json"
+LOCAL_LOTT_PATH = "lott.json"
+LOCAL_SQLITE_PATH = "data.db"
+LOCAL_SESSIONS_PATH = "blackjack.json"
+DRIVE_DIR = "/content/drive/MyDrive/TaixiuBot"
+DRIVE_DATA_PATH = DRIVE_DIR + "/data.json"
+DRIVE_LOTT_PATH = DRIVE_DIR + "/lott.json"
+DRIVE_SQLITE_PATH = DRIVE_DIR + "/data.db"
+DRIVE_SESSIONS_PATH = DRIVE_DIR + "/blackjack.json"
+
+# Check if running in Google Colab
+def is_colab():
+    return os.path.exists("/content")
+
+def _drive_or_local(drive_path, local_path):
+    if is_colab():
+        os.makedirs(DRIVE_DIR, exist_ok=True)
+        return drive_path
+    return local_path
+
+def get_data_path():
+    return _drive_or_local(DRIVE_DATA_PATH, LOCAL_DATA_PATH)
+
+def get_lott_path():
+    return _drive_or_local(DRIVE_LOTT_PATH, LOCAL_LOTT_PATH)
+
+def get_sqlite_path():
+    return _drive_or_local(DRIVE_SQLITE_PATH, LOCAL_SQLITE_PATH)
+
+def get_sessions_path():
+    return _drive_or_local(DRIVE_SESSIONS_PATH, LOCAL_SESSIONS_PATH)
+
+# blackjack.json -> blackjack.shard0-1.json, for state that belongs to the
+# shards one process runs
+def shard_scoped_path(path, shard_ids):
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{'-'.join(str(i) for i in shard_ids)}{ext}"
+
+# "low" trims discord.py's caches and intents to what the commands read
+MEMORY_PROFILES = ("default", "low")
+
+# ===== CONFIG =====
+# Everything create_app() needs, so nothing is read from the environment or
+# the disk when the package is imported. Paths are functions because the
+# stores resolve them again on every save.
+class Config:
+    def __init__(self, token=None, log_level="INFO", storage_backend="json", bet_board=True,
+                 blackjack_decks=6, data_path=get_data_path, lott_path=get_lott_path,
+                 sqlite_path=get_sqlite_path, sessions_path=get_sessions_path, sharded=False,
+                 shard_count=None, shard_ids=None, coordinator_socket=None, prefix_commands=True,
+                 sync_commands=True, memory_profile="default", lottery_channel_id=None, save_interval=5,
+                 snapshot_keep=3, journal_compact_entries=10000, compact_interval=300, sqlite_cache_size=50000,
+                 channel_rate=5, channel_per=5, board_interval=2, identity_ttl=3600, identity_cache_size=10000,
+                 metrics_port=0, metrics_file=None, metrics_dump_interval=60):
+        self.token = token
+        # DEBUG adds per-bet / per-save lines; INFO keeps game and admin events
+        self.log_level = log_level
+        # "json" (data.json + journal) or "sqlite" (data.db, imported from data.json once)
+        self.storage_backend = storage_backend
+        # Collect ?cuoc confirmations on one periodically edited message per
+        # round instead of replying to every bet
+        self.bet_board = bet_board
+        # Decks in the blackjack shoe shared by every table
+        self.blackjack_decks = blackjack_decks
+        self.data_path = data_path
+        self.lott_path = lott_path
+        self.sqlite_path = sqlite_path
+        self.sessions_path = sessions_path
+        # One gateway connection per shard (AutoShardedBot). shard_count=None
+        # takes Discord's recommendation; shard_ids runs only those shards
+        # here, for splitting them over several processes.
+        if shard_ids is not None and shard_count is None:
+            raise ValueError("shard_ids needs shard_count")
+        # Unix socket of a coordinator (python -m taixiu.coordinator) that
+        # owns users and the lottery, so several processes can share them.
+        # A process running only some of the shards implies others running
+        # the rest, and without a coordinator they would all write the same
+        # data.json and lott.json.
+        if shard_ids is not None and set(shard_ids) != set(range(shard_count)) and not coordinator_socket:
+            raise ValueError("shard_ids covering only some shards needs coordinator_socket")
+        self.sharded = sharded or shard_count is not None
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+        self.coordinator_socket = coordinator_socket
+        # ?commands need the privileged message_content intent and every
+        # guild message; without them only slash commands and buttons work
+        self.prefix_commands = prefix_commands
+        # Publish the slash commands to Discord on start
+        self.sync_commands = sync_commands
+        if memory_profile not in MEMORY_PROFILES:
+            raise ValueError(f"memory_profile must be one of {', '.join(MEMORY_PROFILES)}")
+        self.memory_profile = memory_profile
+        # Channel the lottery results are posted to; None only logs them
+        self.lottery_channel_id = lottery_channel_id
+        # Seconds between coalesced journal fsyncs / SQLite transactions
+        self.save_interval = save_interval
+        # Previous snapshots kept as data.json.1, .2, ...
+        self.snapshot_keep = snapshot_keep
+        # Fold a journal into a new snapshot after this many entries or seconds
+        self.journal_compact_entries = journal_compact_entries
+        self.compact_interval = compact_interval
+        # Clean SQLite rows kept in memory after a flush
+        self.sqlite_cache_size = sqlite_cache_size
+        # Messages per channel_per seconds the outbox sends to one channel,
+        # and the minimum seconds between two edits of a bet board
+        self.channel_rate = channel_rate
+        self.channel_per = channel_per
+        self.board_interval = board_interval
+        # Users fetched over REST are reused for identity_ttl seconds
+        self.identity_ttl = identity_ttl
+        self.identity_cache_size = identity_cache_size
+        # Prometheus text on 127.0.0.1:metrics_port (0 = off) and/or
+        # rewritten to metrics_file every metrics_dump_interval seconds
+        self.metrics_port = metrics_port
+        self.metrics_file = metrics_file
+        self.metrics_dump_interval = metrics_dump_interval
+
+    # Guild-independent work (the lottery draw) happens on the process
+    # that runs shard 0, the one Discord also sends DMs to
+    @property
+    def owns_global_tasks(self):
+        return self.shard_ids is None or 0 in self.shard_ids
+
+    # Keyword arguments of the journaled stores (users, lottery, blackjack hands)
+    @property
+    def store_options(self):
+        return dict(flush_interval=self.save_interval, snapshot_keep=self.snapshot_keep,
+                    compact_entries=self.journal_compact_entries, compact_interval=self.compact_interval)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            token=os.getenv("DISCORD_TOKEN"),
+            log_level=os.getenv("LOG_LEVEL", "INFO").upper(),
+            storage_backend=os.getenv("STORAGE_BACKEND", "json").lower(),
+            bet_board=os.getenv("BET_BOARD", "1") == "1",
+            blackjack_decks=int(os.getenv("BLACKJACK_DECKS", "6")),
+            sharded=os.getenv("SHARDED", "0") == "1",
+            shard_count=int(os.environ["SHARD_COUNT"]) if os.getenv("SHARD_COUNT") else None,
+            shard_ids=[int(i) for i in os.environ["SHARD_IDS"].split(",")] if os.getenv("SHARD_IDS") else None,
+            coordinator_socket=os.getenv("COORDINATOR_SOCKET") or None,
+            prefix_commands=os.getenv("PREFIX_COMMANDS", "1") == "1",
+            sync_commands=os.getenv("SYNC_COMMANDS", "1") == "1",
+            memory_profile=os.getenv("MEMORY_PROFILE", "default").lower(),
+            lottery_channel_id=int(os.environ["LOTTERY_CHANNEL_ID"]) if os.getenv("LOTTERY_CHANNEL_ID") else None,
+            save_interval=float(os.getenv("SAVE_INTERVAL", "5")),
+            snapshot_keep=int(os.getenv("SNAPSHOT_KEEP", "3")),
+            journal_compact_entries=int(os.getenv("JOURNAL_COMPACT_ENTRIES", "10000")),
+            compact_interval=float(os.getenv("COMPACT_INTERVAL", "300")),
+            sqlite_cache_size=int(os.getenv("SQLITE_CACHE_SIZE", "50000")),
+            channel_rate=int(os.getenv("CHANNEL_RATE", "5")),
+            channel_per=float(os.getenv("CHANNEL_PER", "5")),
+            board_interval=float(os.getenv("BOARD_INTERVAL", "2")),
+            identity_ttl=float(os.getenv("IDENTITY_TTL", "3600")),
+            identity_cache_size=int(os.getenv("IDENTITY_CACHE_SIZE", "10000")),
+            metrics_port=int(os.getenv("METRICS_PORT", "0")),
+            metrics_file=os.getenv("METRICS_FILE") or None,
+            metrics_dump_interval=float(os.getenv("METRICS_DUMP_INTERVAL", "60")),
+        )
@@ -0,0 +1,4 @@
+from .protocol import DEFAULT_SOCKET, MAX_CLIENTS
+from .client import CoordinatorClient, CoordinatorError
+from .replica import RemoteDataManager, RemoteLotteryStore
+from .server import Coordinator
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import itertools
+
+from .protocol import MAX_LINE, LineWriter, decode
+
+log = logging.getLogger(__name__)
+
+class CoordinatorError(Exception):
+    pass
+
+# ===== CLIENT =====
+# A bot process's connection to the coordinator. send() is fire-and-forget;
+# request() returns a future resolved by the reply with the same id, and
+# calls on_reply with the result first, before any later push is handled.
+# Pushes (changes, which carry no id) go to the handler registered for
+# their op, in the order the coordinator applied them.
+class CoordinatorClient:
+    def __init__(self, path, shard_ids=None):
+        self.path = path
+        self.shard_ids = shard_ids
+        self.out = None
+        self.pending = {}
+        self.on_reply = {}
+        self.ids = itertools.count(1)
+        self.handlers = {}
+        self.slot = None
+        self.closed = False
+        self.shutting_down = False
+        self._starting = None
+        self._reader_task = None
+
+    def on(self, kind, handler):
+        self.handlers[kind] = handler
+
+    # Connects and receives the snapshot once, however many stores ask for it
+    def start(self):
+        if self._starting is None:
+            self._starting = asyncio.ensure_future(self._start())
+        return asyncio.shield(self._starting)
+
+    async def _start(self):
+        reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE)
+        self.out = LineWriter(writer)
+        self._reader_task = asyncio.create_task(self._read(reader))
+        hello = await self.request("hello", shards=self.shard_ids)
+        self.slot = hello["slot"]
+        log.info("🤝 Connected to coordinator %s as slot %d", self.path, self.slot)
+        return hello
+
+    def _check(self):
+        if self.out is None or self.closed:
+            raise ConnectionError("not connected to the coordinator")
+
+    def send(self, op, **fields):
+        self._check()
+        self.out.send({"op": op, **fields})
+
+    def request(self, op, on_reply=None, **fields):
+        self._check()
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        if on_reply is not None:
+            self.on_reply[request_id] = on_reply
+        self.out.send({"id": request_id, "op": op, **fields})
+        return future
+
+    async def _read(self, reader):
+        try:
+            while line := await reader.readline():
+                message = decode(line)
+                if "id" not in message:
+                    self.handlers[message["op"]](message)
+                    continue
+                future = self.pending.pop(message["id"], None)
+                on_reply = self.on_reply.pop(message["id"], None)
+                if future is None or future.done():
+                    continue
+                # Resolved right here, so handlers of pushes read after this
+                # reply already see it as done
+                if "error" in message:
+                    future.set_exception(CoordinatorError(message["error"]))
+                    continue
+                if on_reply is not None:
+                    on_reply(message["ok"])
+                future.set_result(message["ok"])
+        except (ConnectionError, ValueError) as e:
+            log.error("❌ Coordinator connection failed: %s", e)
+        finally:
+            self.closed = True
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("coordinator connection lost"))
+            self.pending.clear()
+            self.on_reply.clear()
+            if not self.shutting_down:
+                log.critical("❌ Lost the coordinator; shared state can no longer be changed")
+
+    async def close(self):
+        self.shutting_down = True
+        if self.out is not None and not self.closed:
+            await self.out.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
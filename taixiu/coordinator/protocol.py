@@ -0,0 +1,74 @@
+import json
+import asyncio
+from datetime import datetime
+
+from ..metrics import METRICS
+
+# Where the coordinator listens unless COORDINATOR_SOCKET says otherwise
+DEFAULT_SOCKET = "taixiu.sock"
+# Longest message line; snapshots are sent in chunks well below it
+MAX_LINE = 64 * 1024 * 1024
+# Users / tickets per snapshot chunk
+SNAPSHOT_CHUNK = 5000
+# Bot processes one coordinator serves at a time. Each gets a slot, which
+# also partitions the first character of new lottery ticket ids so two
+# processes can never pick the same id.
+MAX_CLIENTS = 12
+
+MESSAGES = METRICS.counter("taixiu_coordinator_messages_total", "Messages written to the coordinator socket")
+WRITES = METRICS.counter("taixiu_coordinator_writes_total", "Socket writes (each carries a batch of messages)")
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def encode(message):
+    return (json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=_encode) + "\n").encode()
+
+def decode(line):
+    return json.loads(line)
+
+# ===== LINE WRITER =====
+# Messages are JSON objects, one per line. Everything sent during one turn
+# of the event loop goes out in a single write: a settled round or a burst
+# of bets costs one syscall, and requests never wait for earlier replies
+# (they are matched by id), so they pipeline freely.
+class LineWriter:
+    def __init__(self, writer):
+        self.writer = writer
+        self.buffer = []
+        self.scheduled = False
+
+    def send(self, message):
+        # Encoded right away, so later in-place edits don't leak in
+        self.send_encoded(encode(message))
+
+    # For a message already encoded once for several peers
+    def send_encoded(self, data):
+        self.buffer.append(data)
+        if not self.scheduled:
+            self.scheduled = True
+            asyncio.get_running_loop().call_soon(self.flush)
+
+    def flush(self):
+        self.scheduled = False
+        if not self.buffer:
+            return
+        buffer, self.buffer = self.buffer, []
+        if self.writer.is_closing():
+            return
+        self.writer.write(b"".join(buffer))
+        MESSAGES.inc(len(buffer))
+        WRITES.inc()
+
+    async def drain(self):
+        self.flush()
+        await self.writer.drain()
+
+    async def close(self):
+        try:
+            await self.drain()
+        except ConnectionError:
+            pass
+        self.writer.close()
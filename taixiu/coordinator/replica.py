@@ -0,0 +1,190 @@
+import random
+import functools
+from collections import deque
+from datetime import datetime
+
+from ..storage import DataManager, LotteryStore, User
+from ..storage.lottery_store import TICKET_ALPHABET, TICKET_LENGTH
+from .protocol import MAX_CLIENTS
+
+# ===== USER REPLICA =====
+# The whole user table in memory like DataManager, kept in step with the
+# coordinator instead of a journal: local changes are applied at once and
+# sent on, other processes' changes arrive as pushes. Debits and transfers
+# are the exception: the coordinator decides them against its own balances
+# and they are applied here once it accepted. Persisting is the
+# coordinator's job, so there is never anything to flush here.
+class RemoteDataManager(DataManager):
+    def __init__(self, client):
+        super().__init__(None)
+        self.client = client
+        # Balance changes our own sets made here, oldest first, until the
+        # coordinator echoes them back with the change they made there
+        self.unechoed = deque()
+        client.on("users", self._on_users)
+        client.on("create", self._on_create)
+        client.on("set", self._on_set)
+        client.on("batch", self._on_batch)
+
+    async def load_async(self):
+        await self.client.start()
+        self.leaderboard.rebuild(self.users)
+        self.loaded = True
+
+    def _record(self, entry):
+        pass
+
+    def _prepare_flush(self, compact):
+        return None
+
+    # Nothing is written here; waits until the coordinator wrote every change
+    # of ours it received so far (e.g. the stake of a stored blackjack hand)
+    async def flush_async(self, compact=False):
+        if self.loaded and not self.client.closed:
+            await self.client.request("flush")
+
+    # ----- local changes -----
+    def create_user(self, user_id, username):
+        user = super().create_user(user_id, username)
+        self.client.send("create", uid=user_id, set=user.to_dict())
+        return user
+
+    def update_user(self, user_id, **kwargs):
+        user = self.get_user(user_id)
+        if user is None:
+            return None
+        previous = user.balance
+        super().update_user(user_id, **kwargs)
+        self.unechoed.append(user.balance - previous)
+        self.client.send("set", uid=user_id, set=kwargs, slot=self.client.slot)
+        return user
+
+    # Sent as deltas, which commute with other processes' changes
+    def update_stats(self, user_id, won: bool, amount: int):
+        self.apply_batch({user_id: {"wins" if won else "losses": 1, "total_bet": amount}})
+
+    def apply_batch(self, changes):
+        super().apply_batch(changes)
+        self.client.send("batch", changes=changes)
+
+    # ----- checked by the coordinator -----
+    # Our copy of a balance may not show what another process just spent,
+    # so the coordinator's balance decides; it tells the other processes
+    async def debit_async(self, user_id, amount):
+        changes = {user_id: {"balance": -amount}}
+        accepted = await self.client.request("debit", functools.partial(self._on_accepted, changes), uid=user_id, amount=amount)
+        return self.get_user(user_id) if accepted else None
+
+    async def transfer_async(self, from_id, to_id, amount):
+        changes = {from_id: {"balance": -amount}, to_id: {"balance": amount}} if from_id != to_id else {}
+        return await self.client.request("transfer", functools.partial(self._on_accepted, changes),
+                                         from_uid=from_id, to_uid=to_id, amount=amount)
+
+    # Applied as the reply is read: pushes after it were applied after it
+    # on the coordinator too
+    def _on_accepted(self, changes, accepted):
+        if accepted:
+            DataManager.apply_batch(self, changes)
+
+    # ----- pushes -----
+    def _on_users(self, message):
+        for user_id, record in message["users"].items():
+            self.users[user_id] = User.from_dict(record)
+
+    def _on_create(self, message):
+        if message["uid"] not in self.users:
+            user = self.users[message["uid"]] = User.from_dict(message["set"])
+            self.leaderboard.update(message["uid"], user)
+
+    # Sets come back to their sender too, so everyone applies the fields in
+    # the coordinator's order. A set balance arrives as the change it made
+    # on the coordinator, which commutes with the deltas still on their way
+    # there; the sender swaps it for the change it made here.
+    def _on_set(self, message):
+        applied = self.unechoed.popleft() if message.get("slot") == self.client.slot else 0
+        user = self.users.get(message["uid"])
+        if user is None:
+            return
+        user.update(message["set"])
+        user.balance += message["balance_delta"] - applied
+        self.leaderboard.update(message["uid"], user)
+
+    def _on_batch(self, message):
+        super().apply_batch(message["changes"])
+
+# ===== LOTTERY REPLICA =====
+# Tickets of the current round as the coordinator has them. New ticket ids
+# start with a character reserved for this process's slot, so they are
+# unique without asking. The draw itself happens on the coordinator.
+class RemoteLotteryStore(LotteryStore):
+    def __init__(self, client):
+        super().__init__(None)
+        self.client = client
+        self.first_chars = TICKET_ALPHABET
+        # Our purchases the coordinator hasn't confirmed yet: {future: (user_id, ids)}
+        self.unconfirmed = {}
+        client.on("tickets", self._on_tickets)
+        client.on("lottery_buy", self._on_buy)
+        client.on("lottery_round", self._on_round)
+        client.on("lottery_reset", self._on_reset)
+
+    async def load_async(self):
+        hello = await self.client.start()
+        self.end_time = datetime.fromisoformat(hello["end_time"]) if hello["end_time"] else None
+        self.first_chars = TICKET_ALPHABET[self.client.slot::MAX_CLIENTS]
+        self.loaded = True
+
+    def _record(self, entry):
+        pass
+
+    def _prepare_flush(self, compact):
+        return None
+
+    def _new_ticket_id(self):
+        while True:
+            ticket_id = random.choice(self.first_chars) + "".join(random.choices(TICKET_ALPHABET, k=TICKET_LENGTH - 1))
+            if ticket_id not in self.ticket_ids:
+                return ticket_id
+
+    # ----- local changes -----
+    def buy(self, user_id, count=1):
+        ids = super().buy(user_id, count)
+        future = self.client.request("lottery_buy", uid=user_id, ids=ids)
+        self.unconfirmed[future] = (user_id, ids)
+        future.add_done_callback(self._confirmed)
+        return ids
+
+    def _confirmed(self, future):
+        self.unconfirmed.pop(future, None)
+        if not future.cancelled():
+            future.exception()
+
+    def set_end_time(self, end_time):
+        super().set_end_time(end_time)
+        self.client.send("lottery_round", end_time=end_time)
+
+    async def draw_round(self, k, end_time):
+        winners = await self.client.request("lottery_draw", k=k, end_time=end_time)
+        return [tuple(winner) for winner in winners]
+
+    # ----- pushes -----
+    def _on_tickets(self, message):
+        for ticket_id, user_id in message["tickets"]:
+            self._add(ticket_id, user_id)
+
+    def _on_buy(self, message):
+        for ticket_id in message["ids"]:
+            if ticket_id not in self.ticket_ids:
+                self._add(ticket_id, message["uid"])
+
+    def _on_round(self, message):
+        self.end_time = datetime.fromisoformat(message["end_time"])
+
+    # Purchases the coordinator confirmed before this reset were part of the
+    # drawn round; unconfirmed ones reached it afterwards and carry over
+    def _on_reset(self, message):
+        carried = [purchase for future, purchase in self.unconfirmed.items() if not future.done()]
+        self._reset_state(datetime.fromisoformat(message["end_time"]))
+        for user_id, ids in carried:
+            for ticket_id in ids:
+                self._add(ticket_id, user_id)
@@ -0,0 +1,246 @@
+import os
+import sys
+import signal
+import asyncio
+import logging
+from datetime import datetime
+from itertools import islice
+
+from ..config import Config
+from ..storage import STORAGE_EXECUTOR, create_data_manager, write_behind_task, LotteryStore
+from .protocol import DEFAULT_SOCKET, MAX_LINE, SNAPSHOT_CHUNK, MAX_CLIENTS, LineWriter, encode, decode
+
+log = logging.getLogger(__name__)
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+# One connected bot process
+class Peer:
+    def __init__(self, writer):
+        self.out = LineWriter(writer)
+        self.slot = None
+
+    def send(self, message):
+        self.out.send(message)
+
+# ===== COORDINATOR =====
+# The single writer of the shared state: it owns the user store and the
+# lottery store (persisted exactly as in a single-process bot) and applies
+# the mutations bot processes send over a Unix socket, in arrival order.
+#
+# Each process keeps a replica of users and tickets for its synchronous
+# reads. Balance and stats changes travel as deltas, which commute, so
+# replicas converge whatever order they see them in; the sender has
+# applied its own already and only the others are told. Debits and
+# transfers are requests checked against the balances here, so two
+# processes can't both spend the same money. Field sets (names, marriage,
+# daily) and lottery round changes don't commute, so they go to every
+# process including the sender, and everyone ends up with the
+# coordinator's order; a set balance travels as the delta it made here.
+#
+# A Tai Xiu round is owned by the process that claimed its channel until
+# it releases it or disconnects.
+class Coordinator:
+    def __init__(self, db, lottery_store):
+        self.db = db
+        self.lottery = lottery_store
+        self.peers = set()
+        self.rounds = {}
+        self.server = None
+        # Ops that read from disk first reply from a task of their own
+        self._replying = set()
+
+    async def start(self, path):
+        # A socket file left behind by a crashed coordinator
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self.serve, path, limit=MAX_LINE)
+        log.info("🧭 Coordinator listening on %s", path)
+        return self.server
+
+    async def serve(self, reader, writer):
+        peer = Peer(writer)
+        self.peers.add(peer)
+        try:
+            while line := await reader.readline():
+                self.handle(peer, line)
+        except (ConnectionError, ValueError) as e:
+            log.warning("⚠️ Dropping bot process slot=%s: %s", peer.slot, e)
+        finally:
+            self.drop(peer)
+            await peer.out.close()
+
+    def drop(self, peer):
+        self.peers.discard(peer)
+        released = [channel for channel, owner in self.rounds.items() if owner is peer]
+        for channel in released:
+            del self.rounds[channel]
+        if peer.slot is not None:
+            log.info("👋 Bot process slot=%d left, released %d rounds", peer.slot, len(released))
+
+    def handle(self, peer, line):
+        message = decode(line)
+        try:
+            result = getattr(self, "op_" + message["op"])(peer, message, line)
+        except Exception as e:
+            self.reply_error(peer, message, e)
+            return
+        if asyncio.iscoroutine(result):
+            task = asyncio.ensure_future(self.reply_later(peer, message, result))
+            self._replying.add(task)
+            task.add_done_callback(self._replying.discard)
+        elif message.get("id") is not None:
+            peer.send({"id": message["id"], "ok": result})
+
+    async def reply_later(self, peer, message, result):
+        try:
+            result = await result
+        except Exception as e:
+            self.reply_error(peer, message, e)
+            return
+        if message.get("id") is not None:
+            peer.send({"id": message["id"], "ok": result})
+
+    def reply_error(self, peer, message, error):
+        log.error("❌ Coordinator op %s failed", message.get("op"), exc_info=error)
+        if message.get("id") is not None:
+            peer.send({"id": message["id"], "error": str(error)})
+
+    # A change a peer sent without an id is already in push form and is
+    # forwarded as the very bytes it arrived as
+    def broadcast(self, message, exclude=None):
+        data = message if isinstance(message, bytes) else encode(message)
+        for peer in self.peers:
+            if peer is not exclude and peer.slot is not None:
+                peer.out.send_encoded(data)
+
+    # ----- session -----
+    # Streams the whole state ahead of the reply; the peer is subscribed in
+    # the same step, so it misses no change made after its snapshot. Users
+    # not in memory are read on the storage thread first.
+    async def op_hello(self, peer, message, line):
+        users = await self.db.fetch_users()
+        # Left while the table was read
+        if peer not in self.peers:
+            return None
+        taken = {p.slot for p in self.peers}
+        free = [slot for slot in range(MAX_CLIENTS) if slot not in taken]
+        if not free:
+            raise RuntimeError(f"already serving {MAX_CLIENTS} bot processes")
+        for chunk in _chunks(users, SNAPSHOT_CHUNK):
+            peer.send({"op": "users", "users": {uid: user.to_dict() for uid, user in chunk}})
+        for chunk in _chunks(self.lottery.tickets, SNAPSHOT_CHUNK):
+            peer.send({"op": "tickets", "tickets": chunk})
+        peer.slot = free[0]
+        log.info("🤝 Bot process joined slot=%d shards=%s", peer.slot, message.get("shards"))
+        return {"slot": peer.slot, "end_time": self.lottery.end_time}
+
+    # ----- users -----
+    def op_create(self, peer, message, line):
+        # Two processes may both have created a user that was new to them
+        if self.db.get_user(message["uid"]) is None:
+            self.db.create_user(message["uid"], message["set"]["username"])
+            self.broadcast(line, exclude=peer)
+
+    # Balance is also changed by deltas, so a set balance goes out as the
+    # change it made here (see RemoteDataManager._on_set). The echo goes out
+    # even if the set failed here, since the sender pairs each echo with a
+    # set it made: it then carries the values the fields have here instead,
+    # which undo the sender's change.
+    def op_set(self, peer, message, line):
+        uid, fields = message["uid"], dict(message["set"])
+        user = previous = None
+        try:
+            user = self.db.get_user(uid)
+            previous = user.balance if user else 0
+            self.db.update_user(uid, **fields)
+        except Exception:
+            log.exception("❌ Could not set %s for user %s", ", ".join(fields), uid)
+            record = dict(user.to_dict(), unlimited=user.unlimited) if user else {}
+            fields = {key: record[key] for key in fields if key in record}
+        fields.pop("balance", None)
+        self.broadcast({"op": "set", "uid": uid, "set": fields, "slot": message.get("slot"),
+                        "balance_delta": user.balance - previous if user else 0})
+
+    def op_batch(self, peer, message, line):
+        self.db.apply_batch(message["changes"])
+        self.broadcast(line, exclude=peer)
+
+    # The sender applies an accepted debit or transfer when it gets the reply
+    def op_debit(self, peer, message, line):
+        uid, amount = message["uid"], message["amount"]
+        if self.db._debit(uid, amount) is None:
+            return False
+        self.broadcast({"op": "batch", "changes": {uid: {"balance": -amount}}}, exclude=peer)
+        return True
+
+    def op_transfer(self, peer, message, line):
+        from_id, to_id, amount = message["from_uid"], message["to_uid"], message["amount"]
+        if not self.db._transfer(from_id, to_id, amount):
+            return False
+        if from_id != to_id:
+            self.broadcast({"op": "batch", "changes": {from_id: {"balance": -amount}, to_id: {"balance": amount}}}, exclude=peer)
+        return True
+
+    # Writes what the peer sent so far: it was all applied before this
+    async def op_flush(self, peer, message, line):
+        await self.db.flush_async()
+        # A flush the write-behind task started earlier may still be running
+        await asyncio.get_running_loop().run_in_executor(STORAGE_EXECUTOR, lambda: None)
+
+    # ----- rounds -----
+    def op_claim_round(self, peer, message, line):
+        owner = self.rounds.setdefault(message["channel"], peer)
+        return owner is peer
+
+    def op_release_round(self, peer, message, line):
+        if self.rounds.get(message["channel"]) is peer:
+            del self.rounds[message["channel"]]
+
+    # ----- lottery -----
+    def op_lottery_buy(self, peer, message, line):
+        ids = self.lottery.add_tickets(message["uid"], message["ids"])
+        self.broadcast({"op": "lottery_buy", "uid": message["uid"], "ids": ids}, exclude=peer)
+
+    def op_lottery_round(self, peer, message, line):
+        self.lottery.set_end_time(datetime.fromisoformat(message["end_time"]))
+        self.broadcast(line)
+
+    def op_lottery_draw(self, peer, message, line):
+        winners = self.lottery.draw(message["k"])
+        self.lottery.reset(datetime.fromisoformat(message["end_time"]))
+        self.broadcast({"op": "lottery_reset", "end_time": message["end_time"]})
+        return winners
+
+# ===== MAIN =====
+async def serve(config, path):
+    db = create_data_manager(config)
+    lottery_store = LotteryStore(config.lott_path, **config.store_options)
+    await db.load_async()
+    await lottery_store.load_async()
+
+    coordinator = Coordinator(db, lottery_store)
+    server = await coordinator.start(path)
+    flushers = [asyncio.create_task(write_behind_task(store)) for store in (db, lottery_store)]
+    stop = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+    try:
+        await stop.wait()
+    finally:
+        server.close()
+        for task in flushers:
+            task.cancel()
+        for store in (db, lottery_store):
+            await store.flush_async(compact=True)
+        log.info("💾 Coordinator stopped, stores flushed")
+
+def main():
+    # python -m taixiu.coordinator [socket path]
+    config = Config.from_env()
+    logging.basicConfig(level=config.log_level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    path = sys.argv[1] if len(sys.argv) > 1 else (config.coordinator_socket or DEFAULT_SOCKET)
+    asyncio.run(serve(config, path))
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from .clock import UTC7
+
+# ===== DAILY REWARD =====
+DAILY_REWARDS = [1000, 2000, 5000, 10000, 15000, 20000, 50000, 100000, 150000, 200000, 500000, 1000000]
+# Married users get this much more from ?daily
+MARRIAGE_BONUS = 1.5
+
+def get_daily_reward(day):
+    if day <= 12:
+        return DAILY_REWARDS[day - 1]
+    return 1000000 + (day - 12) * 500000
+
+# (streak, reward) for a ?daily claim at `now`, or None if the user already
+# claimed today
+def claim_daily(user, now):
+    last_daily = user.last_daily
+    if last_daily:
+        if last_daily.tzinfo is None:
+            last_daily = last_daily.replace(tzinfo=UTC7)
+        else:
+            last_daily = last_daily.astimezone(UTC7)
+
+    if last_daily and last_daily.date() == now.date():
+        return None
+
+    streak = user.daily_streak + 1 if last_daily and last_daily.date() == (now - timedelta(days=1)).date() else 1
+    reward = get_daily_reward(streak)
+    if user.married_to:
+        reward = int(reward * MARRIAGE_BONUS)
+    return streak, reward
+
+def format_balance(balance, unlimited=False):
+    if unlimited:
+        return "bằng Aura của anh ấy (∞)"
+    return f"{balance:,}"
+
+# ===== LOTTERY =====
+LOTTERY_PRICE = 50000
+# Most tickets one ?lott buy can take
+MAX_TICKETS_PER_BUY = 1000
+LOTTERY_WINNERS = 10
+LOTTERY_TOP_PRIZE = 1_000_000_000_000
+
+# Prize for each winner in draw order; every place pays half the one before
+def lottery_prizes(count):
+    prizes = []
+    reward = LOTTERY_TOP_PRIZE
+    for _ in range(count):
+        prizes.append(reward)
+        reward = int(reward * 0.5)
+    return prizes
@@ -0,0 +1,185 @@
+import random
+
+# ===== CARDS =====
+# A card is an int 0..51: rank index * 4 + suit index. Values, ace flags and
+# display names are looked up in tables built once, so nothing parses
+# strings while a hand is played; names are only used when rendering.
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+RANK_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]
+SUITS = ['♣️', '♦️', '♥️', '♠️']
+DECK_SIZE = len(RANKS) * len(SUITS)
+# Aces are the last rank, so every card from here on is one
+FIRST_ACE = (len(RANKS) - 1) * len(SUITS)
+
+CARD_VALUES = [RANK_VALUES[card // 4] for card in range(DECK_SIZE)]
+CARD_NAMES = [RANKS[card // 4] + SUITS[card % 4] for card in range(DECK_SIZE)]
+
+XI_BANG = "Xì bàng"
+XI_JACK = "Xì jack"
+NGU_LINH = "Ngũ linh"
+# Hands under this many points that aren't special lose (NON)
+NON_LIMIT = 15
+DEALER_STAND = 17
+MAX_CARDS = 5
+
+# Player's result: the payout per unit bet on top of the stake
+WIN, PUSH, LOSE = 1, 0, -1
+
+# ===== SHOE =====
+# `decks` shuffled decks dealt from the end. A new round reshuffles once
+# fewer than (1 - penetration) of the cards are left, so a hand is never
+# split across two shuffles unless the shoe runs dry.
+class Shoe:
+    def __init__(self, decks=6, penetration=0.75, rng=None):
+        self.decks = decks
+        self.penetration = penetration
+        self.rng = rng or random.Random()
+        self.shuffle()
+
+    def shuffle(self):
+        self.cards = list(range(DECK_SIZE)) * self.decks
+        self.rng.shuffle(self.cards)
+        self.cut = int(len(self.cards) * (1 - self.penetration))
+
+    def begin_round(self):
+        if len(self.cards) <= self.cut:
+            self.shuffle()
+
+    def draw(self):
+        if not self.cards:
+            self.shuffle()
+        return self.cards.pop()
+
+# ===== HAND =====
+# Keeps the best total as cards are added: aces count 11 until the hand
+# would bust, then drop to 1 one at a time.
+class Hand:
+    __slots__ = ("cards", "value", "soft_aces")
+
+    def __init__(self, cards=()):
+        self.cards = []
+        self.value = 0
+        self.soft_aces = 0
+        for card in cards:
+            self.add(card)
+
+    def add(self, card):
+        self.cards.append(card)
+        self.value += CARD_VALUES[card]
+        if card >= FIRST_ACE:
+            self.soft_aces += 1
+        while self.value > 21 and self.soft_aces:
+            self.value -= 10
+            self.soft_aces -= 1
+
+    def __len__(self):
+        return len(self.cards)
+
+def check_special_win(hand):
+    cards = hand.cards
+    if len(cards) == 2:
+        aces = (cards[0] >= FIRST_ACE) + (cards[1] >= FIRST_ACE)
+        if aces == 2:
+            return XI_BANG
+        # An ace and a ten-valued card are the only two-card 21
+        if aces == 1 and hand.value == 21:
+            return XI_JACK
+    if len(cards) == MAX_CARDS and hand.value <= 21:
+        return NGU_LINH
+    return None
+
+def format_card(card):
+    return CARD_NAMES[card]
+
+def format_hand(hand):
+    return ", ".join([CARD_NAMES[card] for card in hand.cards])
+
+# ===== RULES =====
+# After the deal: LOSE if only the dealer has a special hand, WIN if the
+# player has one, None to play on
+def resolve_deal(player, dealer):
+    player_special = check_special_win(player)
+    dealer_special = check_special_win(dealer)
+    if dealer_special and not player_special:
+        return LOSE
+    if player_special:
+        return WIN
+    return None
+
+# Dealer must hit until 17 or special win; calling it again is a no-op
+def play_dealer(dealer, shoe):
+    while dealer.value < DEALER_STAND and not check_special_win(dealer):
+        dealer.add(shoe.draw())
+
+# Result once the player stood and the dealer has played, with the facts
+# the message is built from:
+# (outcome, player_special, dealer_special, player_is_non, dealer_is_non)
+def resolve_stand(player, dealer):
+    player_value = player.value
+    dealer_value = dealer.value
+    player_special = check_special_win(player)
+    dealer_special = check_special_win(dealer)
+
+    player_is_non = player_value < NON_LIMIT and not player_special
+    dealer_is_non = dealer_value < NON_LIMIT and not dealer_special
+
+    if player_is_non and dealer_is_non:
+        outcome = PUSH
+    elif player_is_non:
+        outcome = LOSE
+    elif dealer_is_non:
+        outcome = WIN
+    elif dealer_special and not player_special:
+        outcome = LOSE
+    elif player_special and not dealer_special:
+        outcome = WIN
+    elif dealer_value > 21:
+        outcome = WIN
+    elif player_value > dealer_value:
+        outcome = WIN
+    elif player_value == dealer_value:
+        outcome = PUSH
+    else:
+        outcome = LOSE
+    return outcome, player_special, dealer_special, player_is_non, dealer_is_non
+
+# ===== SIMULATION =====
+# Plays `hands` rounds with the same rules as the bot, the player hitting
+# below `stand_on`. Returns {WIN: n, PUSH: n, LOSE: n}; the house edge is
+# (LOSE - WIN) / hands.
+def simulate(hands, decks=6, stand_on=NON_LIMIT, rng=None):
+    shoe = Shoe(decks, rng=rng)
+    draw = shoe.draw
+    results = {WIN: 0, PUSH: 0, LOSE: 0}
+    for _ in range(hands):
+        shoe.begin_round()
+        player = Hand((draw(), draw()))
+        dealer = Hand((draw(), draw()))
+        outcome = resolve_deal(player, dealer)
+        if outcome is None:
+            while player.value < stand_on and len(player.cards) < MAX_CARDS:
+                player.add(draw())
+            if len(player.cards) == MAX_CARDS and player.value <= 21:
+                outcome = WIN
+            elif player.value > 21:
+                outcome = LOSE
+            else:
+                play_dealer(dealer, shoe)
+                outcome = resolve_stand(player, dealer)[0]
+        results[outcome] += 1
+    return results
+
+if __name__ == "__main__":
+    # python -m taixiu.games.blackjack [hands] [decks] [stand_on]
+    import sys
+    import time
+
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    decks = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    stand_on = int(sys.argv[3]) if len(sys.argv) > 3 else NON_LIMIT
+    start = time.perf_counter()
+    results = simulate(hands, decks, stand_on)
+    elapsed = time.perf_counter() - start
+    print(f"{hands:,} hands, {decks} decks, player stands on {stand_on}: "
+          f"win {results[WIN] / hands:.2%} push {results[PUSH] / hands:.2%} lose {results[LOSE] / hands:.2%}")
+    print(f"house edge {(results[LOSE] - results[WIN]) / hands:+.3%} ({hands / elapsed:,.0f} hands/s)")
@@ -0,0 +1,101 @@
+import random
+import asyncio
+
+# Seconds of betting per round, and the pause before an auto-restarted one
+ROUND_SECONDS = 30
+RESTART_DELAY = 10
+CHOICES = ("tai", "xiu")
+
+# ===== GAME STATE =====
+# A channel's game goes IDLE -> BETTING -> ROLLING -> SETTLING, then either
+# back to IDLE or, with auto-restart, through COOLDOWN into the next round
+IDLE, BETTING, ROLLING, SETTLING, COOLDOWN = "idle", "betting", "rolling", "settling", "cooldown"
+
+class GameState:
+    def __init__(self, channel_id, shard_id=0):
+        self.phase = IDLE
+        self.end_time = None
+        self.bets = []
+        self.channel_id = channel_id
+        # Shard of the channel's guild, for per-shard reporting
+        self.shard_id = shard_id
+        self.auto_restart = False
+        # The channel's round loop while it runs, and what cuts its current
+        # wait short (?txstop, ?win, ?tx during the cooldown)
+        self.task = None
+        self.wakeup = asyncio.Event()
+        self.forced_result = None
+        # Resolved once the current round is settled
+        self.round_over = None
+        self.board = None
+
+    @property
+    def is_running(self):
+        return self.phase in (BETTING, ROLLING, SETTLING)
+
+    @property
+    def accepting_bets(self):
+        return self.phase == BETTING
+
+# One independent round per channel, so every server (and every channel in
+# it) can run its own game at the same time
+class GameRegistry:
+    def __init__(self):
+        self.games = {}
+
+    def get(self, channel_id):
+        return self.games.get(channel_id)
+
+    def get_or_create(self, channel_id, shard_id=0):
+        game = self.games.get(channel_id)
+        if game is None:
+            game = self.games[channel_id] = GameState(channel_id, shard_id)
+        return game
+
+    def is_running(self, channel_id):
+        game = self.games.get(channel_id)
+        return game is not None and game.is_running
+
+    def running_count(self):
+        return sum(1 for g in self.games.values() if g.is_running)
+
+    def running_by_shard(self):
+        counts = {}
+        for g in self.games.values():
+            if g.is_running:
+                counts[g.shard_id] = counts.get(g.shard_id, 0) + 1
+        return counts
+
+    def release(self, game):
+        # Idle channels without auto-restart don't need to keep any state
+        if game.task is None and not game.auto_restart and self.games.get(game.channel_id) is game:
+            del self.games[game.channel_id]
+
+# ===== ROUND RULES =====
+def roll_dice():
+    return random.randint(1, 6), random.randint(1, 6), random.randint(1, 6)
+
+def result_of(dice):
+    return "tai" if sum(dice) >= 11 else "xiu"
+
+# Nets every bet of the round into one delta per user, so a user with several
+# bets is settled consistently by a single apply_batch. Bets of users missing
+# from the store are skipped. Returns (changes, winning bets, losing bets).
+def settle(bets, result, db):
+    changes = {}
+    winners = []
+    losers = []
+    for bet in bets:
+        if not db.get_user(bet['user_id']):
+            continue
+
+        change = changes.setdefault(bet['user_id'], {"balance": 0, "wins": 0, "losses": 0, "total_bet": 0})
+        change["total_bet"] += bet['amount']
+        if bet['choice'] == result:
+            change["balance"] += bet['amount'] * 2
+            change["wins"] += 1
+            winners.append(bet)
+        else:
+            change["losses"] += 1
+            losers.append(bet)
+    return changes, winners, losers
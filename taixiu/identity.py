@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+
+import discord
+
+# Fetched users are reused for this many seconds before another REST call
+IDENTITY_TTL = 3600
+IDENTITY_CACHE_SIZE = 10000
+
+# ===== IDENTITY CACHE =====
+# Resolves user ids to discord.User objects: the gateway cache first, then
+# users we fetched recently, and only then a REST fetch_user. Names seen along
+# the way are compared with the `username` snapshot in the store, and stale
+# ones are written back together by flush_renames().
+class IdentityCache:
+    def __init__(self, bot, db, ttl=IDENTITY_TTL, size=IDENTITY_CACHE_SIZE):
+        self.bot = bot
+        self.db = db
+        self.ttl = ttl
+        self.size = size
+        self.fetched = OrderedDict()
+        self.renames = {}
+
+    def cached(self, user_id):
+        user = self.bot.get_user(int(user_id))
+        if user is not None:
+            return user
+        entry = self.fetched.get(user_id)
+        if entry is None:
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self.fetched[user_id]
+            return None
+        self.fetched.move_to_end(user_id)
+        return user
+
+    async def resolve(self, user_id):
+        user_id = str(user_id)
+        user = self.cached(user_id)
+        if user is None:
+            try:
+                user = await self.bot.fetch_user(int(user_id))
+            except discord.HTTPException:
+                return None
+            self.fetched[user_id] = (time.monotonic() + self.ttl, user)
+            if len(self.fetched) > self.size:
+                self.fetched.popitem(last=False)
+        self.observe(user)
+        return user
+
+    # Display name without any REST call; falls back to the stored snapshot
+    def name(self, user_id, stored_name=None):
+        user = self.cached(user_id)
+        if user is None:
+            return stored_name
+        self.observe(user)
+        return user.name
+
+    # Only users the store holds anyway are compared; commands prefetch their author
+    def observe(self, user):
+        user_id = str(user.id)
+        record = self.db.peek_user(user_id)
+        if record is not None and record.username != user.name:
+            self.renames[user_id] = user.name
+
+    def flush_renames(self):
+        renames, self.renames = self.renames, {}
+        for user_id, name in renames.items():
+            self.db.update_user(user_id, username=name)
+        return len(renames)
@@ -0,0 +1,271 @@
+import gc
+import os
+import sys
+import time
+import asyncio
+import logging
+import resource
+import threading
+from bisect import bisect_left
+from collections import Counter as TypeCounter
+
+log = logging.getLogger(__name__)
+
+# Seconds between rewrites of Config.metrics_file
+METRICS_DUMP_INTERVAL = 60
+# Event loop lag is sampled by a task that expects to wake every LAG_INTERVAL
+LAG_INTERVAL = 1.0
+
+# Seconds; covers everything from a dict lookup to a slow Discord call
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+# ===== METRIC TYPES =====
+# Each metric holds one value per label set. Updates may come from the
+# storage thread as well as the event loop, hence the lock; readers copy
+# under it, since an update may add a label set mid-iteration.
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def items(self):
+        with self._lock:
+            return list(self.values.items())
+
+    def total(self):
+        return sum(value for _, value in self.items())
+
+    def render(self):
+        return [f"{self.name}{_labels(key)} {value}" for key, value in sorted(self.items())]
+
+# With a `label`, fn returns {label value: value}, one series each
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self, name, help, fn=None, label=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self.label = label
+        self.value = 0
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.fn() if self.fn else self.value
+
+    def render(self):
+        if self.label:
+            return [f"{self.name}{_labels(((self.label, key),))} {value}" for key, value in sorted(self.get().items())]
+        return [f"{self.name} {self.get()}"]
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # label key -> [bucket counts..., +Inf count], sum
+        self.counts = {}
+        self.sums = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts = self.counts.get(key)
+            if counts is None:
+                counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+                self.sums[key] = 0
+            counts[bisect_left(self.buckets, value)] += 1
+            self.sums[key] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    # Upper bound of the bucket holding quantile q over all label sets
+    def quantile(self, q):
+        with self._lock:
+            merged = [sum(c) for c in zip(*self.counts.values())]
+        total = sum(merged)
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), merged):
+            seen += count
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+    # [(label key, bucket counts, sum)]
+    def items(self):
+        with self._lock:
+            return [(key, list(counts), self.sums[key]) for key, counts in self.counts.items()]
+
+    def count(self):
+        return sum(sum(counts) for _, counts, _ in self.items())
+
+    def render(self):
+        lines = []
+        for key, counts, total in sorted(self.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', bound),))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_labels(key)} {cumulative}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+# ===== REGISTRY =====
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self.started = time.monotonic()
+
+    def _add(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help):
+        return self._add(Counter(name, help))
+
+    def gauge(self, name, help, fn=None, label=None):
+        return self._add(Gauge(name, help, fn, label))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, buckets))
+
+    def uptime(self):
+        return time.monotonic() - self.started
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+METRICS = Registry()
+
+# ----- shared metrics -----
+COMMAND_SECONDS = METRICS.histogram("taixiu_command_seconds", "Command handler latency")
+COMMAND_ERRORS = METRICS.counter("taixiu_command_errors_total", "Commands that raised")
+FLUSH_SECONDS = METRICS.histogram("taixiu_storage_flush_seconds", "Time spent writing to disk per flush")
+FLUSH_BYTES = METRICS.histogram("taixiu_storage_flush_bytes", "Bytes written per flush", BYTES_BUCKETS)
+SETTLE_SECONDS = METRICS.histogram("taixiu_round_settle_seconds", "Tai Xiu round settlement time")
+BETS = METRICS.counter("taixiu_bets_total", "Accepted bets")
+API_CALLS = METRICS.counter("taixiu_discord_requests_total", "Discord HTTP requests")
+API_ERRORS = METRICS.counter("taixiu_discord_errors_total", "Discord HTTP errors by status")
+RATE_LIMITS = METRICS.counter("taixiu_discord_rate_limits_total", "429 responses from Discord")
+LOOP_LAG = METRICS.histogram("taixiu_loop_lag_seconds", "Event loop wake-up delay")
+UPTIME = METRICS.gauge("taixiu_uptime_seconds", "Seconds since start", METRICS.uptime)
+
+# ===== PROCESS =====
+# Resident memory now, from /proc; elsewhere the peak from getrusage is the
+# closest there is (kilobytes on Linux, bytes on macOS)
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+# (objects the garbage collector tracks, the most common types with their
+# counts). Walks the whole heap, so it is for on-demand reports, not scrapes.
+def object_counts(top=8):
+    counts = TypeCounter(type(obj).__name__ for obj in gc.get_objects())
+    return sum(counts.values()), counts.most_common(top)
+
+RSS = METRICS.gauge("taixiu_process_rss_bytes", "Resident memory of the bot process", rss_bytes)
+
+# ===== INSTRUMENTATION =====
+# Counts every request discord.py's HTTP client makes, and the 429s it
+# retries internally (it only logs those, so they are picked up from its
+# logger).
+class _RateLimitFilter(logging.Filter):
+    def filter(self, record):
+        if record.levelno >= logging.WARNING and "429" in record.getMessage():
+            RATE_LIMITS.inc(source="discord.http")
+        return True
+
+def instrument_http(http):
+    request = http.request
+
+    async def counted(route, **kwargs):
+        API_CALLS.inc(method=route.method)
+        try:
+            return await request(route, **kwargs)
+        except Exception as e:
+            status = getattr(e, "status", None)
+            if status is not None:
+                API_ERRORS.inc(status=status)
+            raise
+
+    http.request = counted
+    logging.getLogger("discord.http").addFilter(_RateLimitFilter())
+
+async def loop_lag_task():
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        LOOP_LAG.observe(max(0.0, loop.time() - start - LAG_INTERVAL))
+
+# ===== EXPORT =====
+async def _serve_request(reader, writer):
+    try:
+        await reader.readline()
+        body = METRICS.render().encode()
+        writer.write(b"HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                     + f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+        await writer.drain()
+    finally:
+        writer.close()
+
+# Prometheus text on 127.0.0.1:port
+async def start_http(port):
+    server = await asyncio.start_server(_serve_request, "127.0.0.1", port)
+    log.info("📈 Metrics on http://127.0.0.1:%d/metrics", port)
+    return server
+
+def _write_file(path, text):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+async def dump_task(path, interval=METRICS_DUMP_INTERVAL, executor=None):
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        await loop.run_in_executor(executor, _write_file, path, METRICS.render())
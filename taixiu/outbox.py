@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import itertools
+from collections import deque
+
+import discord
+
+from .metrics import RATE_LIMITS
+
+log = logging.getLogger(__name__)
+
+# Discord allows roughly 5 messages per 5 seconds per channel
+CHANNEL_RATE = 5
+CHANNEL_PER = 5
+# Minimum seconds between two edits of the same bet board
+BOARD_INTERVAL = 2
+# Channel workers exit after this many idle seconds
+IDLE_TIMEOUT = 60
+MAX_RETRIES = 3
+
+# Lower number = sent first
+PRIORITY_RESULT = 0
+PRIORITY_ANNOUNCE = 1
+PRIORITY_REPLY = 2
+PRIORITY_BOARD = 3
+
+# ===== CHANNEL QUEUE =====
+# Everything sent to one channel goes through one worker that keeps inside the
+# channel's message bucket, so bursts queue up here (results first) instead of
+# turning into 429s from Discord.
+class ChannelQueue:
+    def __init__(self, outbox, channel_id, rate=CHANNEL_RATE, per=CHANNEL_PER):
+        self.outbox = outbox
+        self.channel_id = channel_id
+        self.rate = rate
+        self.per = per
+        self.queue = asyncio.PriorityQueue()
+        self.sent_at = deque(maxlen=rate)
+        self.seq = itertools.count()
+        self.worker = None
+        # Jobs queued or running
+        self.unfinished = 0
+
+    def submit(self, job, priority):
+        future = asyncio.get_running_loop().create_future()
+        # Fire-and-forget callers never look at the result; errors are logged
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.queue.put_nowait((priority, next(self.seq), job, future))
+        self.unfinished += 1
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.create_task(self._run())
+        return future
+
+    async def _wait_for_bucket(self):
+        loop = asyncio.get_running_loop()
+        if len(self.sent_at) == self.rate:
+            wait = self.sent_at[0] + self.per - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        self.sent_at.append(loop.time())
+
+    async def _call(self, job):
+        for attempt in range(MAX_RETRIES):
+            await self._wait_for_bucket()
+            try:
+                return await job()
+            except discord.HTTPException as e:
+                if e.status != 429 or attempt == MAX_RETRIES - 1:
+                    raise
+                self.outbox.rate_limited += 1
+                RATE_LIMITS.inc(source="outbox")
+                retry_after = float(e.response.headers.get("Retry-After", 1))
+                log.warning("⚠️ Rate limited in channel %s, retrying in %ss", self.channel_id, retry_after)
+                await asyncio.sleep(retry_after)
+
+    async def _run(self):
+        while True:
+            try:
+                _, _, job, future = await asyncio.wait_for(self.queue.get(), IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                self.outbox.release(self)
+                return
+            try:
+                if future.cancelled():
+                    continue
+                try:
+                    result = await self._call(job)
+                except Exception as e:
+                    log.error("❌ Failed to send to channel %s: %s", self.channel_id, e)
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            finally:
+                self.unfinished -= 1
+                self.queue.task_done()
+
+class Outbox:
+    def __init__(self, rate=CHANNEL_RATE, per=CHANNEL_PER, board_interval=BOARD_INTERVAL):
+        self.rate = rate
+        self.per = per
+        self.board_interval = board_interval
+        self.channels = {}
+        self.rate_limited = 0
+
+    def for_channel(self, channel_id):
+        queue = self.channels.get(channel_id)
+        if queue is None:
+            queue = self.channels[channel_id] = ChannelQueue(self, channel_id, self.rate, self.per)
+        return queue
+
+    def release(self, queue):
+        if self.channels.get(queue.channel_id) is queue and queue.queue.empty():
+            del self.channels[queue.channel_id]
+
+    # Queues channel.send(**kwargs); await the result to get the Message
+    def send(self, channel, priority=PRIORITY_REPLY, **kwargs):
+        return self.for_channel(channel.id).submit(lambda: channel.send(**kwargs), priority)
+
+    def submit(self, channel, job, priority=PRIORITY_REPLY):
+        return self.for_channel(channel.id).submit(job, priority)
+
+    # Waits until every queued job has run, including jobs those queued
+    async def drain(self):
+        while queues := [queue for queue in self.channels.values() if queue.unfinished]:
+            await asyncio.gather(*(queue.queue.join() for queue in queues))
+
+# ===== BET BOARD =====
+# One message per round that lists the bets, edited at most every
+# board_interval seconds instead of replying to every ?cuoc. The embed is
+# rendered when the edit is actually sent, so a burst of bets costs one edit.
+class BetBoard:
+    def __init__(self, outbox, channel, render):
+        self.outbox = outbox
+        self.channel = channel
+        self.render = render
+        self.message = None
+        self.pending = False
+        self.last_flush = 0
+        self._handle = None
+
+    def touch(self):
+        if self.pending:
+            return
+        self.pending = True
+        loop = asyncio.get_running_loop()
+        delay = max(0, self.last_flush + self.outbox.board_interval - loop.time())
+        self._handle = loop.call_later(delay, self._submit, PRIORITY_BOARD)
+
+    def _submit(self, priority):
+        self._handle = None
+        self.outbox.submit(self.channel, self._flush, priority)
+
+    async def _flush(self):
+        if not self.pending:
+            return self.message
+        self.pending = False
+        self.last_flush = asyncio.get_running_loop().time()
+        embed = self.render()
+        if self.message is None:
+            self.message = await self.channel.send(embed=embed)
+        else:
+            await self.message.edit(embed=embed)
+        return self.message
+
+    # Pushes the final state ahead of the round's result message; an edit
+    # already queued at board priority then finds nothing left to do
+    def close(self):
+        if not self.pending:
+            return
+        if self._handle is not None:
+            self._handle.cancel()
+        self._submit(PRIORITY_RESULT)
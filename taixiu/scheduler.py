@@ -0,0 +1,82 @@
+import asyncio
+import heapq
+import logging
+import itertools
+from datetime import datetime, timezone
+
+log = logging.getLogger(__name__)
+
+# Long sleeps are cut into pieces of at most this many seconds so a wall
+# clock jump (NTP, suspended VM) can't push a deadline out by hours
+MAX_SLEEP = 3600
+
+# ===== SCHEDULER =====
+# Runs named jobs at wall-clock deadlines (timezone-aware datetimes) from one
+# task that sleeps until the earliest deadline. Scheduling a name again
+# re-arms it; the old heap entry is skipped when it comes up. Nothing is
+# persisted here: owners re-derive their deadlines from stored state on start.
+class Scheduler:
+    def __init__(self):
+        self.heap = []
+        self.jobs = {}
+        self.seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+        # The loop only keeps weak references to tasks; jobs that are
+        # running are held here until they finish
+        self._running = set()
+
+    def schedule(self, name, when, callback):
+        entry = (when, next(self.seq), name)
+        self.jobs[name] = (entry, callback)
+        heapq.heappush(self.heap, entry)
+        self._wakeup.set()
+
+    def cancel(self, name):
+        if self.jobs.pop(name, None) is not None:
+            self._wakeup.set()
+
+    def deadline(self, name):
+        job = self.jobs.get(name)
+        return job[0][0] if job else None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    def _next_entry(self):
+        # Drops entries that were re-armed or cancelled since they were pushed
+        while self.heap:
+            entry = self.heap[0]
+            job = self.jobs.get(entry[2])
+            if job is not None and job[0] is entry:
+                return entry
+            heapq.heappop(self.heap)
+        return None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            entry = self._next_entry()
+            if entry is None:
+                await self._wakeup.wait()
+                continue
+            delay = (entry[0] - datetime.now(timezone.utc)).total_seconds()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self.heap)
+            _, callback = self.jobs.pop(entry[2])
+            task = asyncio.create_task(self._fire(entry[2], callback))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _fire(self, name, callback):
+        try:
+            await callback()
+        except Exception as e:
+            log.exception("❌ Scheduled job %s failed: %s", name, e)
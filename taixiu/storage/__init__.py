@@ -0,0 +1,19 @@
+from .files import STORAGE_EXECUTOR, write_json_atomic, read_json_with_fallback
+from .base import BaseDataManager, write_behind_task
+from .user import User, SCHEMA_VERSION
+from .json_store import DataManager
+from .sqlite_store import SQLiteDataManager
+from .lottery_store import LotteryStore
+from .session_store import Session, SessionStore
+
+BACKENDS = ("json", "sqlite")
+
+def create_data_manager(config):
+    backend = config.storage_backend
+    if backend == "json":
+        return DataManager(config.data_path, **config.store_options)
+    if backend == "sqlite":
+        # An empty database is seeded from data.json on first start
+        return SQLiteDataManager(config.sqlite_path, import_path_func=config.data_path,
+                                 flush_interval=config.save_interval, cache_size=config.sqlite_cache_size)
+    raise ValueError(f"Unknown storage backend {backend!r}, expected one of {BACKENDS}")
@@ -0,0 +1,213 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+
+from .files import STORAGE_EXECUTOR
+
+# Seconds between coalesced writes of dirty data (write-behind), unless
+# Config says otherwise
+SAVE_INTERVAL = 5
+
+# Adds a batch of counter deltas ({"balance": +x, "wins": +n, ...}) to one
+# User and returns the resulting absolute values of changed fields.
+# Unlimited users' balances are left alone and, like update_stats, don't
+# accumulate total_bet.
+def apply_deltas(user, deltas):
+    fields = {}
+    for key, delta in deltas.items():
+        if not delta or (user.unlimited and key in ("balance", "total_bet")):
+            continue
+        value = getattr(user, key) + delta
+        setattr(user, key, value)
+        fields[key] = value
+    return fields
+
+# ===== WRITE-BEHIND =====
+# Stores keep mutations in memory, mark themselves dirty, and hand the actual
+# disk work to the storage thread from a single flusher task (see
+# write_behind_task below).
+class WriteBehindStore:
+    def __init__(self, flush_interval=SAVE_INTERVAL):
+        self.flush_interval = flush_interval
+        self.dirty = False
+        self._dirty_event = asyncio.Event()
+        self.loaded = False
+
+    def load(self):
+        raise NotImplementedError
+
+    # Detaches everything that needs writing and returns the job to run on the
+    # storage thread, or None when there is nothing to do
+    def _prepare_flush(self, compact):
+        raise NotImplementedError
+
+    # Called back on the event loop with the job's return value
+    def _after_flush(self, result):
+        pass
+
+    # ----- write-behind plumbing -----
+    def mark_dirty(self):
+        self.dirty = True
+        self._dirty_event.set()
+
+    def _take_dirty(self):
+        self.dirty = False
+        self._dirty_event.clear()
+
+    def flush(self, compact=False):
+        job = self._prepare_flush(compact)
+        if job:
+            self._after_flush(job())
+
+    async def flush_async(self, compact=False):
+        job = self._prepare_flush(compact)
+        if job:
+            await self._before_write()
+            result = await asyncio.get_running_loop().run_in_executor(STORAGE_EXECUTOR, job)
+            self._after_flush(result)
+
+    # Awaited between detaching a flush and writing it, e.g. to write a
+    # store the detached changes depend on first
+    async def _before_write(self):
+        pass
+
+    async def load_async(self):
+        await asyncio.get_running_loop().run_in_executor(STORAGE_EXECUTOR, self.load)
+        self.loaded = True
+        if self.dirty:
+            self.mark_dirty()
+
+    async def wait_dirty(self):
+        await self._dirty_event.wait()
+
+async def write_behind_task(store):
+    # Sleeps until the first mutation, then coalesces everything that happens
+    # during the interval into a single journal fsync (and a snapshot when
+    # compaction is due). Idle periods cost no disk I/O.
+    while True:
+        await store.wait_dirty()
+        await asyncio.sleep(store.flush_interval)
+        await store.flush_async()
+
+# ===== STORAGE INTERFACE =====
+# Everything the bot calls on `db`
+class BaseDataManager(WriteBehindStore):
+    def __init__(self, flush_interval=SAVE_INTERVAL):
+        super().__init__(flush_interval)
+        self._locks = weakref.WeakValueDictionary()
+
+    # ----- backend API -----
+    def get_user(self, user_id):
+        raise NotImplementedError
+
+    def create_user(self, user_id, username):
+        raise NotImplementedError
+
+    def update_user(self, user_id, **kwargs):
+        raise NotImplementedError
+
+    def update_stats(self, user_id, won: bool, amount: int):
+        raise NotImplementedError
+
+    # Applies {user_id: {field: delta}} for many users as one unit (e.g. a
+    # whole round's settlement), recorded as a single persistence entry
+    def apply_batch(self, changes):
+        raise NotImplementedError
+
+    # [(user_id, user), ...] richest first
+    def get_top(self, limit=10):
+        raise NotImplementedError
+
+    def get_top_users(self, limit=10):
+        return [user for _, user in self.get_top(limit)]
+
+    # 1-based position on the leaderboard, or None for unknown users
+    def get_rank(self, user_id):
+        raise NotImplementedError
+
+    # Every (user_id, user), e.g. to hand the whole table to a coordinated process
+    def iter_users(self):
+        raise NotImplementedError
+
+    # ----- reads for the event loop -----
+    # A store that keeps everything in memory answers these at once; one
+    # backed by a database runs the queries on the storage thread instead of
+    # blocking the loop. prefetch() loads rows a command is about to read
+    # with get_user(); get_top, get_rank and iter_users are for scripts.
+    async def prefetch(self, *user_ids):
+        pass
+
+    async def fetch_top(self, limit=10):
+        return self.get_top(limit)
+
+    async def fetch_rank(self, user_id):
+        return self.get_rank(user_id)
+
+    # [(user_id, user), ...] for every user, current when it returns
+    async def fetch_users(self):
+        return list(self.iter_users())
+
+    # The user if this process holds it in memory, without reading anything
+    def peek_user(self, user_id):
+        return self.get_user(user_id)
+
+    # ----- atomic balance operations -----
+    # Each runs start to finish without awaiting, so two commands for the same
+    # user can never interleave between reading and writing a balance. They
+    # return the User after the change or None on failure.
+    def credit(self, user_id, amount):
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        self.apply_batch({user_id: {"balance": amount}})
+        return user
+
+    # Checked spending is awaited: with a coordinator the balance that
+    # decides is the shared one, not this process's copy of it. A store
+    # that owns its balances answers at once.
+    async def debit_async(self, user_id, amount):
+        return self._debit(user_id, amount)
+
+    # Moves `amount` in a single persistence entry; False if the sender is
+    # missing or can't cover it
+    async def transfer_async(self, from_id, to_id, amount):
+        return self._transfer(from_id, to_id, amount)
+
+    # The checks themselves, against this store's own balances. Only for the
+    # owner of those balances: the async API above and the coordinator.
+    def _debit(self, user_id, amount):
+        user = self.get_user(user_id)
+        if not user or not user.can_afford(amount):
+            return None
+        self.apply_batch({user_id: {"balance": -amount}})
+        return user
+
+    def _transfer(self, from_id, to_id, amount):
+        sender, receiver = self.get_user(from_id), self.get_user(to_id)
+        if not sender or not receiver or not sender.can_afford(amount):
+            return False
+        if from_id != to_id:
+            self.apply_batch({from_id: {"balance": -amount}, to_id: {"balance": amount}})
+        return True
+
+    # ----- per-user locks -----
+    # For flows that must hold a user's state across awaits (e.g. settling a
+    # blackjack hand and editing its message). Locks are per user, so
+    # unrelated users never wait on each other, and are taken in a fixed
+    # order so two multi-user flows cannot deadlock.
+    def user_lock(self, user_id):
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = self._locks[user_id] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def locked(self, *user_ids):
+        locks = [self.user_lock(uid) for uid in sorted(set(user_ids))]
+        for lock in locks:
+            await lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
@@ -0,0 +1,81 @@
+import os
+import json
+import shutil
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Number of previous snapshots kept next to each file (data.json.1, .2, ...)
+SNAPSHOT_KEEP = 3
+
+# Single worker so writes to the same file are never reordered
+STORAGE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+
+# ===== SNAPSHOT FILES =====
+def snapshot_paths(path, keep=SNAPSHOT_KEEP):
+    return [path] + [f"{path}.{i}" for i in range(1, keep + 1)]
+
+def fsync_dir(directory):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def rotate_snapshots(path, keep=SNAPSHOT_KEEP):
+    if keep <= 0 or not os.path.exists(path):
+        return
+    for i in range(keep - 1, 0, -1):
+        older = f"{path}.{i}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i + 1}")
+    # Link (or copy) instead of moving so `path` never disappears
+    backup = f"{path}.1"
+    try:
+        if os.path.exists(backup):
+            os.remove(backup)
+        os.link(path, backup)
+    except OSError:
+        shutil.copy2(path, backup)
+
+# Write to a temp file, fsync and rename over `path`; returns bytes written
+def write_json_atomic(path, obj, keep=SNAPSHOT_KEEP):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        payload = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        rotate_snapshots(path, keep)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    fsync_dir(directory)
+    return len(payload)
+
+# Return (obj, path_used) for the newest snapshot that parses and validates
+def read_json_with_fallback(path, is_valid=lambda obj: True, keep=SNAPSHOT_KEEP):
+    for candidate in snapshot_paths(path, keep):
+        if not os.path.exists(candidate):
+            continue
+        try:
+            with open(candidate, "r", encoding="utf-8") as f:
+                obj = json.load(f)
+        except Exception as e:
+            log.warning("⚠️ Skipping unreadable snapshot %s: %s", candidate, e)
+            continue
+        if is_valid(obj):
+            return obj, candidate
+        log.warning("⚠️ Skipping invalid snapshot %s", candidate)
+    return None, None
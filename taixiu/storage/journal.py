@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import logging
+from datetime import datetime
+
+from ..metrics import FLUSH_SECONDS, FLUSH_BYTES
+from .base import WriteBehindStore, SAVE_INTERVAL
+from .files import SNAPSHOT_KEEP, write_json_atomic
+
+log = logging.getLogger(__name__)
+
+# Journal compaction: rewrite the snapshot after this many entries or seconds
+JOURNAL_COMPACT_ENTRIES = 10000
+COMPACT_INTERVAL = 300
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+# ===== JOURNAL =====
+# Append-only JSON-lines log next to a snapshot file. Entries are serialised
+# on the event loop when recorded (so later in-place edits don't leak in) and
+# written by the storage thread during flush; a snapshot write folds them in
+# and truncates the file.
+class Journal:
+    def __init__(self, get_path_func, compact_entries=JOURNAL_COMPACT_ENTRIES, compact_interval=COMPACT_INTERVAL,
+                 snapshot_keep=SNAPSHOT_KEEP):
+        self.get_path_func = get_path_func
+        self.compact_entries = compact_entries
+        self.compact_interval = compact_interval
+        self.snapshot_keep = snapshot_keep
+        self.pending = []
+        self.entries = 0
+        self.last_snapshot = time.monotonic()
+        self._file = None
+
+    @property
+    def path(self):
+        return self.get_path_func()
+
+    # Metrics label: data.json, lott.json, ...
+    @property
+    def store(self):
+        return os.path.basename(self.path)[:-len(".wal")]
+
+    # ----- event loop side -----
+    def record(self, entry):
+        entry.setdefault("ts", int(time.time()))
+        self.pending.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":"), default=_encode) + "\n")
+        self.entries += 1
+
+    def take_pending(self):
+        lines, self.pending = self.pending, []
+        return lines
+
+    def compaction_due(self):
+        return (self.entries >= self.compact_entries
+                or time.monotonic() - self.last_snapshot >= self.compact_interval)
+
+    def start_snapshot(self):
+        self.entries = 0
+        self.last_snapshot = time.monotonic()
+
+    # ----- storage thread side -----
+    def replay(self, apply):
+        self.entries = 0
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Torn last line after a crash
+                    continue
+                apply(entry)
+                self.entries += 1
+        if self.entries:
+            log.info("📜 Replayed %d journal entries from %s", self.entries, self.path)
+        return self.entries
+
+    def open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def append(self, lines):
+        if not lines:
+            return
+        start = time.perf_counter()
+        self.open()
+        self._file.writelines(lines)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        FLUSH_SECONDS.observe(time.perf_counter() - start, store=self.store, kind="journal")
+        FLUSH_BYTES.observe(sum(len(line.encode("utf-8")) for line in lines), store=self.store, kind="journal")
+
+    def truncate(self):
+        if self._file is not None:
+            self._file.seek(0)
+            self._file.truncate()
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+    # Writes a full snapshot and truncates the journal it now contains. The
+    # pending lines are appended first: a crash after the new snapshot is in
+    # place but before the truncate replays the whole journal onto it, and
+    # only a journal holding every entry up to the snapshot ends where the
+    # snapshot does. If the snapshot cannot be written, the journal is kept.
+    def write_snapshot(self, path, snapshot, lines):
+        self.append(lines)
+        start = time.perf_counter()
+        try:
+            written = write_json_atomic(path, snapshot, self.snapshot_keep)
+        except Exception as e:
+            log.error("❌ Failed to save to %s: %s", path, e)
+            return False
+        self.truncate()
+        elapsed = time.perf_counter() - start
+        FLUSH_SECONDS.observe(elapsed, store=self.store, kind="snapshot")
+        FLUSH_BYTES.observe(written, store=self.store, kind="snapshot")
+        log.debug("💾 Saved to %s bytes=%d ms=%.1f", path, written, elapsed * 1000)
+        return True
+
+# ===== JOURNALED STORE =====
+# A write-behind store kept whole in memory and persisted as <path> snapshot
+# plus <path>.wal journal. Subclasses read their snapshot format, replay
+# their journal entries and build the next snapshot; recording, appending
+# and compaction are the same for all of them. The keyword arguments are
+# Config.store_options.
+class JournaledStore(WriteBehindStore):
+    def __init__(self, get_path_func, flush_interval=SAVE_INTERVAL, snapshot_keep=SNAPSHOT_KEEP,
+                 compact_entries=JOURNAL_COMPACT_ENTRIES, compact_interval=COMPACT_INTERVAL):
+        super().__init__(flush_interval)
+        self.get_path_func = get_path_func
+        self.snapshot_keep = snapshot_keep
+        self.journal = Journal(lambda: self.local_path + ".wal", compact_entries, compact_interval, snapshot_keep)
+
+    @property
+    def local_path(self):
+        return self.get_path_func()
+
+    # Runs on the storage thread
+    def load(self):
+        self.read()
+        self.journal.open()
+
+    # Snapshot plus journal into memory, without opening anything for
+    # writing (e.g. to import them elsewhere)
+    def read(self):
+        self._load_snapshot()
+        # Plain flag only: this runs on the storage thread
+        if self.journal.replay(self._replay_entry):
+            self.dirty = True
+
+    def _load_snapshot(self):
+        raise NotImplementedError
+
+    def _replay_entry(self, entry):
+        raise NotImplementedError
+
+    # The full state to write when the journal is compacted
+    def _snapshot(self):
+        raise NotImplementedError
+
+    def _record(self, entry):
+        self.journal.record(entry)
+        self.mark_dirty()
+
+    def _prepare_flush(self, compact):
+        if not self.dirty and not (compact and self.journal.entries):
+            return None
+        self._take_dirty()
+        lines = self.journal.take_pending()
+        if compact or self.journal.compaction_due():
+            snapshot, path = self._snapshot(), self.local_path
+            self.journal.start_snapshot()
+            return lambda: self.journal.write_snapshot(path, snapshot, lines)
+        return lambda: self.journal.append(lines)
@@ -0,0 +1,51 @@
+from bisect import bisect_left, insort
+
+# ===== LEADERBOARD INDEX =====
+# Users ordered richest first, kept up to date on every balance change so
+# ?top is a slice and a user's rank is a binary search. Unlimited users get
+# their own tier ahead of every number instead of being compared as floats,
+# and ties are broken by user id so every key is unique.
+INF_TIER = 0
+NUMBER_TIER = 1
+
+def rank_key(user_id, user):
+    if user.unlimited:
+        return (INF_TIER, 0, user_id)
+    return (NUMBER_TIER, -user.balance, user_id)
+
+class Leaderboard:
+    def __init__(self):
+        self.keys = []
+        self.key_of = {}
+
+    def rebuild(self, users):
+        self.key_of = {uid: rank_key(uid, u) for uid, u in users.items()}
+        self.keys = sorted(self.key_of.values())
+
+    def update(self, user_id, user):
+        new_key = rank_key(user_id, user)
+        old_key = self.key_of.get(user_id)
+        if old_key == new_key:
+            return
+        if old_key is not None:
+            del self.keys[bisect_left(self.keys, old_key)]
+        insort(self.keys, new_key)
+        self.key_of[user_id] = new_key
+
+    def remove(self, user_id):
+        old_key = self.key_of.pop(user_id, None)
+        if old_key is not None:
+            del self.keys[bisect_left(self.keys, old_key)]
+
+    def top(self, limit):
+        return [key[2] for key in self.keys[:limit]]
+
+    # 1 + number of users strictly richer, so equal balances share a rank
+    def rank(self, user_id):
+        key = self.key_of.get(user_id)
+        if key is None:
+            return None
+        return bisect_left(self.keys, key[:2] + ("",)) + 1
+
+    def __len__(self):
+        return len(self.keys)
@@ -0,0 +1,109 @@
+import random
+from collections import Counter
+from datetime import datetime
+
+from .files import read_json_with_fallback
+from .journal import JournaledStore
+
+TICKET_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+TICKET_LENGTH = 7
+
+# ===== LOTTERY STORE =====
+# Tickets of the current lottery round kept in memory with a per-user count
+# and an id index, persisted like data.json: lott.json snapshot plus a
+# lott.json.wal journal with one line per purchase (however many tickets).
+class LotteryStore(JournaledStore):
+    def __init__(self, get_path_func, **options):
+        super().__init__(get_path_func, **options)
+        self._reset_state(None)
+
+    def _reset_state(self, end_time):
+        self.tickets = []
+        self.ticket_ids = set()
+        self.per_user = Counter()
+        self.end_time = end_time
+
+    def _add(self, ticket_id, user_id):
+        self.tickets.append((ticket_id, user_id))
+        self.ticket_ids.add(ticket_id)
+        self.per_user[user_id] += 1
+
+    def _load_snapshot(self):
+        data, _ = read_json_with_fallback(self.local_path, lambda obj: isinstance(obj, dict) and "tickets" in obj, self.snapshot_keep)
+        if data is None:
+            data = {"tickets": [], "end_time": None}
+        self._reset_state(datetime.fromisoformat(data["end_time"]) if data["end_time"] else None)
+        for ticket in data["tickets"]:
+            self._add(ticket["id"], ticket["user_id"])
+
+    # Ticket ids are unique, so purchases already in the snapshot are skipped
+    def _replay_entry(self, entry):
+        if entry["op"] == "buy":
+            for ticket_id in entry["ids"]:
+                if ticket_id not in self.ticket_ids:
+                    self._add(ticket_id, entry["uid"])
+        elif entry["op"] == "round":
+            self.end_time = datetime.fromisoformat(entry["end_time"])
+        elif entry["op"] == "reset":
+            self._reset_state(datetime.fromisoformat(entry["end_time"]))
+
+    # ----- queries -----
+    @property
+    def ticket_count(self):
+        return len(self.tickets)
+
+    def user_ticket_count(self, user_id):
+        return self.per_user[user_id]
+
+    # Up to k distinct (ticket_id, user_id) winners in prize order; sampling
+    # touches only k tickets instead of shuffling the whole round
+    def draw(self, k):
+        return random.sample(self.tickets, min(k, len(self.tickets)))
+
+    # ----- mutations -----
+    def _new_ticket_id(self):
+        while True:
+            ticket_id = "".join(random.choices(TICKET_ALPHABET, k=TICKET_LENGTH))
+            if ticket_id not in self.ticket_ids:
+                return ticket_id
+
+    def buy(self, user_id, count=1):
+        ids = []
+        for _ in range(count):
+            ticket_id = self._new_ticket_id()
+            self._add(ticket_id, user_id)
+            ids.append(ticket_id)
+        self._record({"op": "buy", "uid": user_id, "ids": ids})
+        return ids
+
+    # Tickets whose ids were picked by another process (see the coordinator);
+    # ids that are already taken are skipped, as on replay
+    def add_tickets(self, user_id, ids):
+        ids = [ticket_id for ticket_id in ids if ticket_id not in self.ticket_ids]
+        for ticket_id in ids:
+            self._add(ticket_id, user_id)
+        self._record({"op": "buy", "uid": user_id, "ids": ids})
+        return ids
+
+    def set_end_time(self, end_time):
+        self.end_time = end_time
+        self._record({"op": "round", "end_time": end_time.isoformat()})
+
+    # Clears all tickets and opens the next round
+    def reset(self, end_time):
+        self._reset_state(end_time)
+        self._record({"op": "reset", "end_time": end_time.isoformat()})
+
+    # Draws the round's winners and opens the next round in one step.
+    # Async because a coordinated process has to ask the coordinator.
+    async def draw_round(self, k, end_time):
+        winners = self.draw(k)
+        self.reset(end_time)
+        return winners
+
+    # ----- flushing -----
+    def _snapshot(self):
+        return {
+            "tickets": [{"user_id": user_id, "id": ticket_id} for ticket_id, user_id in self.tickets],
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+        }
@@ -0,0 +1,160 @@
+from collections import Counter
+from datetime import datetime
+
+from .files import read_json_with_fallback
+from .journal import JournaledStore
+
+# ===== BLACKJACK SESSION =====
+# One blackjack hand in progress: the stake already taken from the player,
+# both hands as card ints, the message carrying the buttons and the time it
+# is settled without the player.
+class Session:
+    __slots__ = ("id", "user_id", "username", "channel_id", "message_id", "bet", "player", "dealer", "expires_at")
+
+    def __init__(self, id, user_id, username, channel_id, bet, player, dealer, expires_at, message_id=None):
+        self.id = id
+        self.user_id = user_id
+        self.username = username
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.bet = bet
+        self.player = player
+        self.dealer = dealer
+        self.expires_at = expires_at
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(record["id"], record["user_id"], record["username"], record["channel_id"], record["bet"],
+                   list(record["player"]), list(record["dealer"]), datetime.fromisoformat(record["expires_at"]),
+                   record.get("message_id"))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "user_id": self.user_id,
+            "username": self.username,
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+            "bet": self.bet,
+            "player": list(self.player),
+            "dealer": list(self.dealer),
+            "expires_at": self.expires_at.isoformat(),
+        }
+
+# ===== SESSION STORE =====
+# Open blackjack sessions, persisted like lott.json (blackjack.json snapshot
+# plus a blackjack.json.wal journal) so a restart neither loses the stakes
+# nor the buttons' state. Closed sessions are dropped from memory at once.
+#
+# The stakes and payouts themselves are in `ledger`, the user store. The cog
+# moves the money before it records the session change that goes with it
+# (the debit before open, the credit before close), and every flush here
+# writes the ledger first. So a stored open hand's stake was taken, and a
+# stored close was paid, whenever the two files were cut short by a crash.
+class SessionStore(JournaledStore):
+    def __init__(self, get_path_func, ledger=None, **options):
+        super().__init__(get_path_func, **options)
+        self.ledger = ledger
+        self._reset_state()
+
+    def _reset_state(self):
+        self.sessions = {}
+        self.by_message = {}
+        self.per_user = Counter()
+        # Ids are never reused, so journal entries of closed sessions can't
+        # be mistaken for a later one
+        self.last_id = 0
+
+    def _add(self, session):
+        self.sessions[session.id] = session
+        self.last_id = max(self.last_id, session.id)
+        self.per_user[session.user_id] += 1
+        if session.message_id is not None:
+            self.by_message[session.message_id] = session
+
+    def _remove(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            return None
+        self.per_user[session.user_id] -= 1
+        if not self.per_user[session.user_id]:
+            del self.per_user[session.user_id]
+        self.by_message.pop(session.message_id, None)
+        return session
+
+    def _load_snapshot(self):
+        data, _ = read_json_with_fallback(self.local_path, lambda obj: isinstance(obj, dict) and "sessions" in obj, self.snapshot_keep)
+        self._reset_state()
+        data = data or {"sessions": []}
+        for record in data["sessions"]:
+            self._add(Session.from_dict(record))
+        self.last_id = max(self.last_id, data.get("last_id", 0))
+
+    def _replay_entry(self, entry):
+        if entry["op"] == "open":
+            self._remove(entry["session"]["id"])
+            self._add(Session.from_dict(entry["session"]))
+        elif entry["op"] == "update":
+            session = self.sessions.get(entry["id"])
+            if session is not None:
+                self._apply_update(session, entry)
+        elif entry["op"] == "close":
+            self._remove(entry["id"])
+
+    def _apply_update(self, session, fields):
+        if "message_id" in fields:
+            self.by_message.pop(session.message_id, None)
+            session.message_id = fields["message_id"]
+            self.by_message[session.message_id] = session
+        if "player" in fields:
+            session.player = list(fields["player"])
+        if "dealer" in fields:
+            session.dealer = list(fields["dealer"])
+        if "expires_at" in fields:
+            value = fields["expires_at"]
+            session.expires_at = datetime.fromisoformat(value) if isinstance(value, str) else value
+
+    # ----- queries -----
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def for_message(self, message_id):
+        return self.by_message.get(message_id)
+
+    def user_session_count(self, user_id):
+        return self.per_user[user_id]
+
+    # ----- mutations -----
+    def open(self, user_id, username, channel_id, bet, player, dealer, expires_at):
+        self.last_id += 1
+        session = Session(self.last_id, user_id, username, channel_id, bet, list(player), list(dealer), expires_at)
+        self._add(session)
+        self._record({"op": "open", "session": session.to_dict()})
+        return session
+
+    # Records changed fields: message_id, player, dealer, expires_at
+    def update(self, session, **fields):
+        self._apply_update(session, fields)
+        entry = {"op": "update", "id": session.id}
+        for key, value in fields.items():
+            entry[key] = list(value) if key in ("player", "dealer") else value
+        self._record(entry)
+
+    def close(self, session):
+        if self._remove(session.id) is not None:
+            self._record({"op": "close", "id": session.id})
+
+    # ----- flushing -----
+    def flush(self, compact=False):
+        if self.ledger is not None:
+            self.ledger.flush()
+        super().flush(compact)
+
+    # Our entries are already detached: ledger changes recorded after them
+    # may or may not be written too, but none they depend on is left out
+    async def _before_write(self):
+        if self.ledger is not None:
+            await self.ledger.flush_async()
+
+    def _snapshot(self):
+        return {"last_id": self.last_id, "sessions": [session.to_dict() for session in self.sessions.values()]}
@@ -0,0 +1,367 @@
+import os
+import sys
+import json
+import time
+import heapq
+import asyncio
+import logging
+import sqlite3
+from collections import OrderedDict
+
+from .base import BaseDataManager, SAVE_INTERVAL, apply_deltas
+from .files import STORAGE_EXECUTOR
+from .json_store import DataManager
+from .user import User, SCHEMA_VERSION
+from ..metrics import FLUSH_SECONDS
+
+log = logging.getLogger(__name__)
+
+# Clean rows kept in memory after a flush; dirty rows are never evicted
+SQLITE_CACHE_SIZE = 50000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id      TEXT PRIMARY KEY,
+    username     TEXT,
+    balance      TEXT NOT NULL,
+    balance_sort REAL NOT NULL,
+    unlimited    INTEGER NOT NULL DEFAULT 0,
+    daily_streak INTEGER NOT NULL DEFAULT 0,
+    last_daily   TEXT,
+    married_to   TEXT,
+    ring         TEXT,
+    inventory    TEXT NOT NULL DEFAULT '[]',
+    wins         INTEGER NOT NULL DEFAULT 0,
+    losses       INTEGER NOT NULL DEFAULT 0,
+    total_bet    TEXT NOT NULL DEFAULT '0',
+    extra        TEXT
+);
+CREATE INDEX IF NOT EXISTS users_balance_sort ON users (balance_sort DESC);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+COLUMNS = ("user_id", "username", "balance", "balance_sort", "unlimited", "daily_streak", "last_daily",
+           "married_to", "ring", "inventory", "wins", "losses", "total_bet", "extra")
+
+UPSERT = (
+    f"INSERT INTO users ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    f"ON CONFLICT(user_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS if c != "user_id")
+)
+
+# Balances and total_bet can exceed SQLite's 64-bit integers, so they are
+# stored as exact decimal text; balance_sort is a REAL copy used only for
+# ordering the leaderboard.
+def encode_row(user_id, user):
+    return (
+        user_id,
+        user.username,
+        str(user.balance),
+        float(user.sort_balance),
+        int(user.unlimited),
+        user.daily_streak,
+        user.last_daily_text,
+        user.married_to,
+        user.ring,
+        json.dumps(user.inventory, ensure_ascii=False),
+        user.wins,
+        user.losses,
+        str(user.total_bet),
+        json.dumps(user.extra, ensure_ascii=False) if user.extra else None,
+    )
+
+def decode_row(row):
+    return User(
+        username=row["username"],
+        balance=int(row["balance"]),
+        unlimited=bool(row["unlimited"]),
+        daily_streak=row["daily_streak"],
+        last_daily=row["last_daily"],
+        married_to=row["married_to"],
+        ring=row["ring"],
+        inventory=json.loads(row["inventory"]),
+        wins=row["wins"],
+        losses=row["losses"],
+        total_bet=int(row["total_bet"]),
+        extra=json.loads(row["extra"]) if row["extra"] else None,
+    )
+
+# ===== SQLITE DATA MANAGER =====
+# One row per user in WAL mode. Rows are loaded on first access and cached;
+# mutations only touch the cached row and mark it dirty, and the flusher
+# upserts exactly the dirty rows in one transaction on the storage thread.
+class SQLiteDataManager(BaseDataManager):
+    def __init__(self, get_path_func, import_path_func=None, flush_interval=SAVE_INTERVAL, cache_size=SQLITE_CACHE_SIZE):
+        super().__init__(flush_interval)
+        self.get_path_func = get_path_func
+        self.import_path_func = import_path_func
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.dirty_ids = set()
+        self._reader = None
+        self._writer = None
+
+    @property
+    def local_path(self):
+        return self.get_path_func()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.local_path, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # Runs on the storage thread. The writer connection stays on that thread;
+    # the reader connection is only used from the event loop afterwards.
+    def load(self):
+        self._writer = self._connect()
+        self._writer.executescript(SCHEMA)
+        self._migrate()
+        self._reader = self._connect()
+        count = self._reader.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+        if count == 0 and self.import_path_func:
+            json_path = self.import_path_func()
+            if os.path.exists(json_path):
+                imported = self.import_json(json_path)
+                log.info("📥 Imported %d users from %s into %s", imported, json_path, self.local_path)
+                return
+        log.info("📥 Opened %s (%d users)", self.local_path, count)
+
+    # Version 1 tables stored unlimited balances as balance = 'inf' and had no
+    # unlimited column (which CREATE TABLE IF NOT EXISTS doesn't add)
+    def _migrate(self):
+        row = self._writer.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        version = int(row["value"]) if row else 1
+        if version >= SCHEMA_VERSION:
+            return
+        columns = {col["name"] for col in self._writer.execute("PRAGMA table_info(users)")}
+        with self._writer:
+            self._writer.execute("BEGIN")
+            # A table created just now by SCHEMA already has the column
+            upgraded = "unlimited" not in columns
+            if upgraded:
+                self._writer.execute("ALTER TABLE users ADD COLUMN unlimited INTEGER NOT NULL DEFAULT 0")
+                self._writer.execute("UPDATE users SET unlimited = 1, balance = '0' WHERE balance = 'inf'")
+            self._writer.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (str(SCHEMA_VERSION),))
+        if upgraded:
+            log.info("🔄 Migrated %s from schema %d to %d", self.local_path, version, SCHEMA_VERSION)
+
+    # One-shot migration of a data.json snapshot (plus its journal) into the table
+    def import_json(self, json_path):
+        source = DataManager(lambda: json_path)
+        source.read()
+        users = source.users
+        with self._writer:
+            self._writer.execute("BEGIN")
+            self._writer.executemany(UPSERT, (encode_row(uid, u) for uid, u in users.items()))
+            self._writer.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('imported_from', ?)", (json_path,))
+        return len(users)
+
+    def close(self):
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                conn.close()
+        self._reader = self._writer = None
+
+    # ----- rows -----
+    def _touch(self, user_id, user):
+        self.cache[user_id] = user
+        self.cache.move_to_end(user_id)
+        self.dirty_ids.add(user_id)
+        self.mark_dirty()
+
+    # A miss reads the row right here; the event loop prefetches first
+    def get_user(self, user_id):
+        user = self.cache.get(user_id)
+        if user is not None:
+            self.cache.move_to_end(user_id)
+            return user
+        row = self._reader.execute("SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        user = decode_row(row)
+        self.cache[user_id] = user
+        return user
+
+    def create_user(self, user_id, username):
+        user = User(username)
+        self._touch(user_id, user)
+        return user
+
+    def update_user(self, user_id, **kwargs):
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        user.update(kwargs)
+        self._touch(user_id, user)
+        return user
+
+    def update_stats(self, user_id, won: bool, amount: int):
+        user = self.get_user(user_id)
+        if not user: return
+
+        if won:
+            user.wins += 1
+        else:
+            user.losses += 1
+
+        if not user.unlimited:
+            user.total_bet += amount
+        self._touch(user_id, user)
+
+    def apply_batch(self, changes):
+        # Dirty rows of one batch always land in the same flush transaction
+        for user_id, deltas in changes.items():
+            user = self.get_user(user_id)
+            if user and apply_deltas(user, deltas):
+                self._touch(user_id, user)
+
+    # ----- leaderboard -----
+    # Rows not flushed yet may rank differently than on disk: they are left
+    # out of the queries and merged in from the cache. The queries take the
+    # connection to use: the reader for the synchronous API, the writer when
+    # they run on the storage thread.
+    def _top_rows(self, conn, limit, exclude):
+        rows = conn.execute(
+            "SELECT * FROM users WHERE user_id NOT IN (SELECT value FROM json_each(?)) ORDER BY balance_sort DESC LIMIT ?",
+            (json.dumps(exclude), limit),
+        ).fetchall()
+        return [(row["user_id"], decode_row(row)) for row in rows]
+
+    def _count_richer(self, conn, key, exclude):
+        return conn.execute(
+            "SELECT COUNT(*) FROM users WHERE balance_sort > ? AND user_id NOT IN (SELECT value FROM json_each(?))",
+            (key, json.dumps(exclude)),
+        ).fetchone()[0]
+
+    # `dirty` is [(user_id, user)], taken when the query was issued
+    def _merge_top(self, rows, dirty, limit):
+        ranked = [(uid, self.cache.get(uid) or user) for uid, user in rows] + dirty
+        return heapq.nlargest(limit, ranked, key=lambda item: item[1].sort_balance)
+
+    def _dirty_users(self):
+        return [(uid, self.cache[uid]) for uid in self.dirty_ids]
+
+    def get_top(self, limit=10):
+        dirty = self._dirty_users()
+        return self._merge_top(self._top_rows(self._reader, limit, [uid for uid, _ in dirty]), dirty, limit)
+
+    def get_rank(self, user_id):
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        key = float(user.sort_balance)
+        dirty = [uid for uid in self.dirty_ids if uid != user_id]
+        richer = sum(1 for uid in dirty if float(self.cache[uid].sort_balance) > key)
+        return richer + self._count_richer(self._reader, key, dirty + [user_id]) + 1
+
+    # ----- reads on the storage thread -----
+    # The dirty ids are taken before the query is queued. A flush that runs
+    # first only writes rows the query leaves out anyway.
+    def _read_rows(self, user_ids):
+        rows = self._writer.execute(
+            "SELECT * FROM users WHERE user_id IN (SELECT value FROM json_each(?))", (json.dumps(user_ids),)
+        ).fetchall()
+        return {row["user_id"]: decode_row(row) for row in rows}
+
+    def _all_rows(self):
+        return {row["user_id"]: decode_row(row) for row in self._writer.execute("SELECT * FROM users")}
+
+    async def _on_storage_thread(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(STORAGE_EXECUTOR, fn, *args)
+
+    async def prefetch(self, *user_ids):
+        missing = [uid for uid in set(user_ids) if uid not in self.cache]
+        if not missing:
+            return
+        rows = await self._on_storage_thread(self._read_rows, missing)
+        for user_id, user in rows.items():
+            # Loaded or created on the loop in the meantime: that copy is current
+            if user_id not in self.cache:
+                self.cache[user_id] = user
+
+    async def fetch_top(self, limit=10):
+        dirty = self._dirty_users()
+        rows = await self._on_storage_thread(self._top_rows, self._writer, limit, [uid for uid, _ in dirty])
+        return self._merge_top(rows, dirty, limit)
+
+    async def fetch_rank(self, user_id):
+        await self.prefetch(user_id)
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        key = float(user.sort_balance)
+        dirty = [uid for uid in self.dirty_ids if uid != user_id]
+        richer = sum(1 for uid in dirty if float(self.cache[uid].sort_balance) > key)
+        return richer + await self._on_storage_thread(self._count_richer, self._writer, key, dirty + [user_id]) + 1
+
+    # Rows changed while the table was read are in the cache, and stay there
+    # until a flush queued after the read is done; created ones only are
+    async def fetch_users(self):
+        rows = await self._on_storage_thread(self._all_rows)
+        users = [(uid, self.cache.get(uid) or user) for uid, user in rows.items()]
+        return users + [(uid, self.cache[uid]) for uid in self.dirty_ids if uid not in rows]
+
+    def peek_user(self, user_id):
+        return self.cache.get(user_id)
+
+    def iter_users(self):
+        # Rows not flushed yet are only current in the cache
+        for row in self._reader.execute("SELECT * FROM users"):
+            user_id = row["user_id"]
+            yield user_id, self.cache.get(user_id) or decode_row(row)
+        for user_id in list(self.dirty_ids):
+            if self._reader.execute("SELECT 1 FROM users WHERE user_id = ?", (user_id,)).fetchone() is None:
+                yield user_id, self.cache[user_id]
+
+    # ----- flushing -----
+    def _write_rows(self, rows):
+        start = time.perf_counter()
+        try:
+            with self._writer:
+                self._writer.execute("BEGIN")
+                self._writer.executemany(UPSERT, rows.values())
+        except sqlite3.Error as e:
+            log.error("❌ Failed to save to %s: %s", self.local_path, e)
+            return list(rows)
+        FLUSH_SECONDS.observe(time.perf_counter() - start, store=os.path.basename(self.local_path), kind="rows")
+        return []
+
+    def _prepare_flush(self, compact):
+        if not self.dirty:
+            return None
+        self._take_dirty()
+        rows = {uid: encode_row(uid, self.cache[uid]) for uid in self.dirty_ids}
+        self.dirty_ids = set()
+        return lambda: self._write_rows(rows)
+
+    def _after_flush(self, failed_ids):
+        if failed_ids:
+            self.dirty_ids.update(failed_ids)
+            self.mark_dirty()
+        # Evict least recently used clean rows once they are safely on disk
+        excess = len(self.cache) - self.cache_size
+        if excess <= 0:
+            return
+        for user_id in list(self.cache):
+            if excess <= 0:
+                break
+            if user_id not in self.dirty_ids:
+                del self.cache[user_id]
+                excess -= 1
+
+if __name__ == "__main__":
+    # python -m taixiu.storage.sqlite_store data.json data.db
+    if len(sys.argv) != 3:
+        print("Usage: python -m taixiu.storage.sqlite_store <data.json> <data.db>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    json_path, db_path = sys.argv[1], sys.argv[2]
+    store = SQLiteDataManager(lambda: db_path)
+    store.load()
+    print(f"📥 Imported {store.import_json(json_path)} users from {json_path} into {db_path}")
+    store.close()
@@ -0,0 +1,156 @@
+import logging
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+STARTING_BALANCE = 1000
+
+# Version of the stored user format, written into data.json as "schema" and
+# into the SQLite meta table. Bump it and add a step to MIGRATIONS when the
+# format changes.
+SCHEMA_VERSION = 2
+
+# ===== USER RECORD =====
+# One slotted object per user instead of a dict. Unlimited users keep a
+# numeric balance (normally 0) and set `unlimited`, so money code checks a
+# bool instead of comparing balances against the string "inf".
+# last_daily is kept as the stored ISO string until something reads it, so
+# loading and snapshotting users never parses dates nobody looks at.
+class User:
+    __slots__ = ("username", "balance", "unlimited", "daily_streak", "_last_daily", "married_to",
+                 "ring", "inventory", "wins", "losses", "total_bet", "extra")
+
+    FIELDS = ("username", "balance", "unlimited", "daily_streak", "last_daily", "married_to",
+              "ring", "inventory", "wins", "losses", "total_bet")
+
+    def __init__(self, username=None, balance=STARTING_BALANCE, unlimited=False, daily_streak=0,
+                 last_daily=None, married_to=None, ring=None, inventory=None, wins=0, losses=0,
+                 total_bet=0, extra=None):
+        self.username = username
+        self.balance = balance
+        self.unlimited = unlimited
+        self.daily_streak = daily_streak
+        self.last_daily = last_daily
+        self.married_to = married_to
+        self.ring = ring
+        self.inventory = inventory if inventory is not None else []
+        self.wins = wins
+        self.losses = losses
+        self.total_bet = total_bet
+        # Unknown keys from the stored record, written back untouched
+        self.extra = extra
+
+    # Record in the current schema; older ones go through upgrade_record first
+    @classmethod
+    def from_dict(cls, record):
+        known = {k: v for k, v in record.items() if k in cls.FIELDS}
+        extra = {k: v for k, v in record.items() if k not in cls.FIELDS}
+        return cls(**known, extra=extra or None)
+
+    def to_dict(self):
+        record = {
+            "username": self.username,
+            "balance": self.balance,
+            "daily_streak": self.daily_streak,
+            "last_daily": self.last_daily_text,
+            "married_to": self.married_to,
+            "ring": self.ring,
+            "inventory": list(self.inventory),
+            "wins": self.wins,
+            "losses": self.losses,
+            "total_bet": self.total_bet,
+        }
+        if self.unlimited:
+            record["unlimited"] = True
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    # datetime (parsed once on first access) or None
+    @property
+    def last_daily(self):
+        value = self._last_daily
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                value = None
+            self._last_daily = value
+        return value
+
+    @last_daily.setter
+    def last_daily(self, value):
+        self._last_daily = value
+
+    # Stored form, without parsing
+    @property
+    def last_daily_text(self):
+        value = self._last_daily
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    def update(self, fields):
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+    def can_afford(self, amount):
+        return self.unlimited or self.balance >= amount
+
+    # Leaderboard ordering value
+    @property
+    def sort_balance(self):
+        return float("inf") if self.unlimited else self.balance
+
+    def __repr__(self):
+        return f"User({self.username!r}, balance={self.balance!r}, unlimited={self.unlimited})"
+
+# ----- schema migrations -----
+# Version 1 (no "schema" key) stored unlimited balances as "balance": "inf"
+def _v1_to_v2(record):
+    if record.get("balance") == "inf":
+        record = {**record, "balance": 0, "unlimited": True}
+    return record
+
+MIGRATIONS = {1: _v1_to_v2}
+
+# ----- file formats -----
+# "users": {"users": {id: record}} written by this package (any schema).
+# "list": [{"discord_id": id, ...}] written by the old db_manager.py, which
+# started users at 0 and had an is_admin flag (kept in User.extra).
+def detect_format(data):
+    if isinstance(data, dict) and isinstance(data.get("users"), dict):
+        return "users"
+    if isinstance(data, list) and all(isinstance(r, dict) and "discord_id" in r for r in data):
+        return "list"
+    return None
+
+def _from_list(records):
+    users = {}
+    for record in records:
+        record = dict(record)
+        user_id = str(record.pop("discord_id"))
+        users[user_id] = {"balance": 0, **record}
+    return {"schema": 1, "users": users}
+
+# Brings a full record or a partial field update written at `version` up to
+# SCHEMA_VERSION. Each step is a no-op on data that is already current, so
+# journal entries of unknown age can always be upgraded from version 1.
+def upgrade_record(record, version=1):
+    while version < SCHEMA_VERSION:
+        record = MIGRATIONS[version](record)
+        version += 1
+    return record
+
+# Returns ({user_id: User}, version) for data in any known format; anything
+# older than SCHEMA_VERSION should be written back in the current one
+def load_users(data):
+    fmt = detect_format(data)
+    if fmt is None:
+        raise ValueError("unknown user data format")
+    if fmt == "list":
+        log.info("🔄 Converting %d users from the db_manager list format", len(data))
+        data = _from_list(data)
+    version = data.get("schema", 1)
+    users = {uid: User.from_dict(upgrade_record(record, version)) for uid, record in data["users"].items()}
+    if version < SCHEMA_VERSION:
+        log.info("🔄 Migrated %d users from schema %d to %d", len(users), version, SCHEMA_VERSION)
+    return users, version
@@ -0,0 +1,74 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("discord")
+
+from taixiu.bot.blackjack import Blackjack
+from taixiu.clock import get_now_utc7
+from taixiu.config import Config
+from taixiu.outbox import Outbox
+from taixiu.scheduler import Scheduler
+from taixiu.storage import DataManager, SessionStore
+
+class Message:
+    def __init__(self, edits, id):
+        self.edits = edits
+        self.id = id
+
+    async def edit(self, **kwargs):
+        self.edits.append((self.id, kwargs["embed"].title))
+
+class Channel:
+    def __init__(self, id):
+        self.id = id
+        self.edits = []
+
+    def get_partial_message(self, message_id):
+        return Message(self.edits, message_id)
+
+def open_stores(tmp_path):
+    db = DataManager(lambda: str(tmp_path / "data.json"))
+    sessions = SessionStore(lambda: str(tmp_path / "blackjack.json"), ledger=db)
+    db.load()
+    sessions.load()
+    return db, sessions
+
+# ===== REFUNDS ON START =====
+def test_stale_hands_are_refunded_and_live_ones_rearmed(tmp_path):
+    db, sessions = open_stores(tmp_path)
+    db.create_user("1", "an")
+    db.apply_batch({"1": {"balance": -600}})
+    now = get_now_utc7()
+    expired = sessions.open("1", "an", 10, 100, [1, 2], [3, 4], now - timedelta(seconds=5))
+    sessions.update(expired, message_id=500)
+    # Crashed before its message was sent
+    sessions.open("1", "an", 10, 200, [1, 2], [3, 4], now + timedelta(seconds=60))
+    live = sessions.open("1", "an", 10, 300, [1, 2], [3, 4], now + timedelta(seconds=60))
+    sessions.update(live, message_id=501)
+    sessions.flush()
+
+    async def scenario():
+        db, sessions = open_stores(tmp_path)
+        channel = Channel(10)
+        app = SimpleNamespace(bot=SimpleNamespace(get_channel=lambda _: channel), db=db, session_store=sessions,
+                              scheduler=Scheduler(), outbox=Outbox(), prepare_interaction=None,
+                              on_interaction_error=None, config=Config(token="x"))
+        cog = Blackjack(app)
+        await cog.on_stores_loaded()
+        await sessions.flush_async()
+        return cog, db, sessions, channel
+
+    cog, db, sessions, channel = asyncio.run(scenario())
+    assert cog.resumed.is_set()
+    assert db.get_user("1").balance == 400 + 100 + 200
+    assert list(sessions.sessions) == [live.id]
+    assert cog.scheduler.deadline(f"blackjack:{live.id}") == live.expires_at
+    assert channel.edits == [(500, "↩️ HOÀN TIỀN")]
+
+    # The refunds were stored: a second start pays nothing again
+    db, sessions = open_stores(tmp_path)
+    assert db.get_user("1").balance == 700
+    assert list(sessions.sessions) == [live.id]
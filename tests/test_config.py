@@ -0,0 +1,26 @@
+import pytest
+
+from taixiu.config import Config
+
+# ===== SHARDS =====
+def test_some_shards_need_a_coordinator():
+    with pytest.raises(ValueError):
+        Config(shard_count=4, shard_ids=[0, 1])
+
+def test_some_shards_with_a_coordinator():
+    config = Config(shard_count=4, shard_ids=[2, 3], coordinator_socket="taixiu.sock")
+    assert config.sharded and not config.owns_global_tasks
+
+def test_all_shards_in_one_process():
+    assert Config(shard_count=2, shard_ids=[1, 0]).owns_global_tasks
+
+def test_from_env(monkeypatch):
+    monkeypatch.setenv("SHARD_COUNT", "2")
+    monkeypatch.setenv("SHARD_IDS", "1")
+    with pytest.raises(ValueError):
+        Config.from_env()
+    monkeypatch.setenv("COORDINATOR_SOCKET", "taixiu.sock")
+    monkeypatch.setenv("SAVE_INTERVAL", "0.5")
+    config = Config.from_env()
+    assert config.shard_ids == [1]
+    assert config.store_options["flush_interval"] == 0.5
@@ -0,0 +1,121 @@
+import asyncio
+import contextlib
+
+from taixiu.coordinator import CoordinatorClient, RemoteDataManager
+from taixiu.coordinator.server import Coordinator
+from taixiu.storage import DataManager, LotteryStore
+
+# A coordinator on a socket in tmp_path with `count` replicas connected,
+# run inside one event loop
+@contextlib.asynccontextmanager
+async def cluster(tmp_path, count=2):
+    db = DataManager(lambda: str(tmp_path / "data.json"))
+    lottery = LotteryStore(lambda: str(tmp_path / "lott.json"))
+    await db.load_async()
+    await lottery.load_async()
+    coordinator = Coordinator(db, lottery)
+    server = await coordinator.start(str(tmp_path / "taixiu.sock"))
+    replicas = []
+    try:
+        for _ in range(count):
+            replica = RemoteDataManager(CoordinatorClient(str(tmp_path / "taixiu.sock")))
+            await replica.load_async()
+            replicas.append(replica)
+        yield coordinator, replicas
+    finally:
+        for replica in replicas:
+            await replica.client.close()
+        server.close()
+
+# A reply comes after everything the replica sent before it was applied,
+# and after every push the coordinator sent it before that
+async def settle(replicas):
+    for _ in range(2):
+        for replica in replicas:
+            await replica.client.request("claim_round", channel=-1)
+
+def balances(coordinator, replicas, uid):
+    return [coordinator.db.get_user(uid).balance] + [replica.get_user(uid).balance for replica in replicas]
+
+# ===== DELTAS =====
+def test_deltas_from_every_replica_converge(tmp_path):
+    async def main():
+        async with cluster(tmp_path) as (coordinator, (a, b)):
+            a.create_user("1", "an")
+            await settle([a, b])
+            a.credit("1", 100)
+            b.credit("1", 50)
+            a.update_stats("1", True, 30)
+            b.apply_batch({"1": {"balance": -20}})
+            await settle([a, b])
+            return balances(coordinator, [a, b], "1"), [r.get_user("1").wins for r in (a, b)]
+
+    assert asyncio.run(main()) == ([1130, 1130, 1130], [1, 1])
+
+def test_concurrent_debits_cannot_overdraw(tmp_path):
+    async def main():
+        async with cluster(tmp_path) as (coordinator, (a, b)):
+            a.create_user("1", "an")
+            await settle([a, b])
+            results = await asyncio.gather(a.debit_async("1", 800), b.debit_async("1", 800))
+            await settle([a, b])
+            return [result is not None for result in results], balances(coordinator, [a, b], "1")
+
+    accepted, result = asyncio.run(main())
+    assert sorted(accepted) == [False, True]
+    assert result == [200, 200, 200]
+
+def test_transfer_is_checked_by_the_coordinator(tmp_path):
+    async def main():
+        async with cluster(tmp_path) as (coordinator, (a, b)):
+            a.create_user("1", "an")
+            a.create_user("2", "binh")
+            await settle([a, b])
+            b.apply_batch({"1": {"balance": -900}})
+            refused = await a.transfer_async("1", "2", 500)
+            accepted = await a.transfer_async("1", "2", 100)
+            await settle([a, b])
+            return refused, accepted, balances(coordinator, [a, b], "1"), balances(coordinator, [a, b], "2")
+
+    assert asyncio.run(main()) == (False, True, [0, 0, 0], [1100, 1100, 1100])
+
+# ===== SET ECHOES =====
+def test_set_balance_keeps_deltas_in_flight(tmp_path):
+    async def main():
+        async with cluster(tmp_path) as (coordinator, (a, b)):
+            a.create_user("1", "an")
+            await settle([a, b])
+            a.update_user("1", balance=500)
+            b.credit("1", 100)
+            await settle([a, b])
+            return balances(coordinator, [a, b], "1"), a.unechoed
+
+    result, unechoed = asyncio.run(main())
+    assert result == [600, 600, 600]
+    assert not unechoed
+
+def test_failed_set_is_still_echoed(tmp_path, monkeypatch):
+    async def main():
+        async with cluster(tmp_path) as (coordinator, (a, b)):
+            a.create_user("1", "an")
+            await settle([a, b])
+            update_user = coordinator.db.update_user
+
+            def fail_once(user_id, **fields):
+                monkeypatch.setattr(coordinator.db, "update_user", update_user)
+                raise OSError("disk full")
+
+            monkeypatch.setattr(coordinator.db, "update_user", fail_once)
+            a.update_user("1", balance=5000, username="an2")
+            await settle([a, b])
+            failed = balances(coordinator, [a, b], "1"), a.get_user("1").username, len(a.unechoed)
+            # Later echoes pair with the right change again
+            a.update_user("1", balance=500)
+            b.credit("1", 100)
+            await settle([a, b])
+            return failed, balances(coordinator, [a, b], "1"), len(a.unechoed)
+
+    failed, after, unechoed = asyncio.run(main())
+    assert failed == ([1000, 1000, 1000], "an", 0)
+    assert after == [600, 600, 600]
+    assert unechoed == 0
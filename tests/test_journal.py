@@ -0,0 +1,79 @@
+import json
+from datetime import datetime
+
+from taixiu.storage import DataManager, LotteryStore
+from taixiu.storage.journal import Journal
+
+def open_store(path):
+    db = DataManager(lambda: str(path))
+    db.load()
+    return db
+
+# ===== REPLAY =====
+def test_journal_replays_onto_snapshot(tmp_path):
+    path = tmp_path / "data.json"
+    db = open_store(path)
+    db.create_user("1", "an")
+    db.flush(compact=True)
+    db.credit("1", 250)
+    db.update_user("1", married_to="2")
+    db.update_stats("1", True, 100)
+    db.flush()
+
+    assert json.loads(path.read_text())["users"]["1"]["balance"] == 1000
+    restored = open_store(path).get_user("1")
+    assert (restored.balance, restored.married_to, restored.wins, restored.total_bet) == (1250, "2", 1, 100)
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / "data.json"
+    db = open_store(path)
+    db.create_user("1", "an")
+    db.credit("1", 5)
+    db.flush()
+    with open(f"{path}.wal", "a", encoding="utf-8") as f:
+        f.write('{"op":"batch","users":{"1":{"bal')
+
+    assert open_store(path).get_user("1").balance == 1005
+
+def test_compaction_folds_journal_into_snapshot(tmp_path):
+    path = tmp_path / "data.json"
+    db = open_store(path)
+    db.create_user("1", "an")
+    db.credit("1", 10)
+    db.flush(compact=True)
+
+    assert (tmp_path / "data.json.wal").read_text() == ""
+    assert json.loads(path.read_text())["users"]["1"]["balance"] == 1010
+    assert open_store(path).get_user("1").balance == 1010
+
+# ----- crash between replacing the snapshot and truncating the journal -----
+def test_crash_before_truncate_keeps_newer_balances(tmp_path, monkeypatch):
+    path = tmp_path / "data.json"
+    db = open_store(path)
+    db.create_user("1", "an")
+    db.credit("1", 100)
+    db.flush()
+    # Only in the snapshot the compaction writes
+    db.credit("1", 50)
+    monkeypatch.setattr(Journal, "truncate", lambda self: None)
+    db.flush(compact=True)
+    monkeypatch.undo()
+
+    assert json.loads(path.read_text())["users"]["1"]["balance"] == 1150
+    assert open_store(path).get_user("1").balance == 1150
+
+def test_crash_before_truncate_keeps_lottery_reset(tmp_path, monkeypatch):
+    path = tmp_path / "lott.json"
+    lottery = LotteryStore(lambda: str(path))
+    lottery.load()
+    lottery.buy("1", 3)
+    lottery.flush()
+    lottery.reset(datetime(2026, 1, 1))
+    bought = lottery.buy("2")
+    monkeypatch.setattr(Journal, "truncate", lambda self: None)
+    lottery.flush(compact=True)
+    monkeypatch.undo()
+
+    restored = LotteryStore(lambda: str(path))
+    restored.load()
+    assert restored.tickets == [(bought[0], "2")]
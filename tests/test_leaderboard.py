@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from taixiu.storage import DataManager, SQLiteDataManager
+from taixiu.storage.leaderboard import Leaderboard
+from taixiu.storage.user import User
+
+def users(**balances):
+    result = {}
+    for uid, balance in balances.items():
+        user = User(username=uid)
+        if balance == "inf":
+            user.unlimited = True
+        else:
+            user.balance = balance
+        result[uid] = user
+    return result
+
+# ===== INDEX =====
+def test_ties_share_a_rank_and_unlimited_comes_first():
+    board = Leaderboard()
+    board.rebuild(users(a=500, b=900, c=500, d="inf", e=100))
+    assert board.top(10) == ["d", "b", "a", "c", "e"]
+    assert [board.rank(uid) for uid in "dbace"] == [1, 2, 3, 3, 5]
+    assert board.rank("missing") is None
+
+def test_updates_move_users_and_remove_drops_them():
+    everyone = users(a=500, b=900, c=100)
+    board = Leaderboard()
+    board.rebuild(everyone)
+    everyone["c"].balance = 1000
+    board.update("c", everyone["c"])
+    board.remove("b")
+    assert board.top(2) == ["c", "a"]
+    assert (board.rank("a"), board.rank("b"), len(board)) == (2, None, 2)
+
+# ===== STORES =====
+@pytest.mark.parametrize("kind", ["json", "sqlite"])
+def test_stores_agree_on_top_and_rank(tmp_path, kind):
+    async def scenario():
+        if kind == "json":
+            db = DataManager(lambda: str(tmp_path / "data.json"))
+        else:
+            db = SQLiteDataManager(lambda: str(tmp_path / "data.db"))
+        db.load()
+        for uid in ("1", "2", "3", "4"):
+            db.create_user(uid, uid)
+        db.credit("2", 500)
+        db.update_user("3", unlimited=True)
+        db.flush()
+        # Unflushed changes count too
+        db.credit("4", 500)
+        top = [uid for uid, _ in await db.fetch_top(3)]
+        ranks = [await db.fetch_rank(uid) for uid in ("1", "2", "3", "4", "5")]
+        if kind == "sqlite":
+            db.close()
+        return top, ranks
+    top, ranks = asyncio.run(scenario())
+    assert top == ["3", "2", "4"]
+    assert ranks == [4, 2, 1, 2, None]
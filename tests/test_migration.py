@@ -0,0 +1,67 @@
+import json
+import sqlite3
+
+from taixiu.storage import DataManager, SQLiteDataManager, SCHEMA_VERSION
+
+def open_json(path):
+    db = DataManager(lambda: str(path))
+    db.load()
+    return db
+
+# ===== DATA.JSON =====
+def test_v1_snapshot_is_upgraded_and_written_back(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"users": {
+        "1": {"username": "an", "balance": "inf", "wins": 3},
+        "2": {"username": "binh", "balance": 700, "nickname": "b"},
+    }}))
+    db = open_json(path)
+    rich, other = db.get_user("1"), db.get_user("2")
+    assert (rich.unlimited, rich.balance, rich.wins) == (True, 0, 3)
+    assert (other.unlimited, other.balance, other.extra) == (False, 700, {"nickname": "b"})
+    assert db.dirty
+
+    db.flush(compact=True)
+    stored = json.loads(path.read_text())
+    assert stored["schema"] == SCHEMA_VERSION
+    assert stored["users"]["1"]["unlimited"] is True
+    assert stored["users"]["2"]["nickname"] == "b"
+
+def test_db_manager_list_format(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps([{"discord_id": 42, "username": "an", "is_admin": True}]))
+    user = open_json(path).get_user("42")
+    assert (user.username, user.balance, user.extra) == ("an", 0, {"is_admin": True})
+
+def test_v1_journal_entries_are_upgraded(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"schema": SCHEMA_VERSION, "users": {"1": {"username": "an", "balance": 5}}}))
+    (tmp_path / "data.json.wal").write_text(json.dumps({"op": "update", "uid": "1", "set": {"balance": "inf"}}) + "\n")
+    user = open_json(path).get_user("1")
+    assert (user.unlimited, user.balance) == (True, 0)
+
+# ===== SQLITE =====
+def test_v1_table_gets_the_unlimited_column(tmp_path):
+    path = tmp_path / "data.db"
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (
+            user_id TEXT PRIMARY KEY, username TEXT, balance TEXT NOT NULL, balance_sort REAL NOT NULL,
+            daily_streak INTEGER NOT NULL DEFAULT 0, last_daily TEXT, married_to TEXT, ring TEXT,
+            inventory TEXT NOT NULL DEFAULT '[]', wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0, total_bet TEXT NOT NULL DEFAULT '0', extra TEXT
+        );
+        INSERT INTO users (user_id, username, balance, balance_sort) VALUES ('1', 'an', 'inf', 1e308);
+        INSERT INTO users (user_id, username, balance, balance_sort) VALUES ('2', 'binh', '700', 700);
+    """)
+    conn.commit()
+    conn.close()
+
+    db = SQLiteDataManager(lambda: str(path))
+    db.load()
+    rich, other = db.get_user("1"), db.get_user("2")
+    version = db._reader.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()[0]
+    db.close()
+    assert (rich.unlimited, rich.balance) == (True, 0)
+    assert (other.unlimited, other.balance) == (False, 700)
+    assert int(version) == SCHEMA_VERSION
@@ -0,0 +1,61 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from taixiu.outbox import Outbox, PRIORITY_BOARD, PRIORITY_REPLY, PRIORITY_RESULT
+
+class Channel:
+    def __init__(self, id=1):
+        self.id = id
+        self.sent = []
+
+    async def send(self, **kwargs):
+        self.sent.append((asyncio.get_running_loop().time(), kwargs["content"]))
+        return kwargs["content"]
+
+# ===== RATE LIMITING =====
+def test_sends_stay_inside_the_channel_bucket():
+    async def scenario():
+        outbox = Outbox(rate=2, per=0.2)
+        channel = Channel()
+        for n in range(5):
+            outbox.send(channel, content=n)
+        await outbox.drain()
+        return channel.sent
+    sent = asyncio.run(scenario())
+    times = [at for at, _ in sent]
+    assert [content for _, content in sent] == [0, 1, 2, 3, 4]
+    # Any three consecutive sends span at least one window
+    assert all(times[n + 2] - times[n] >= 0.19 for n in range(len(times) - 2))
+
+def test_queued_results_go_out_before_replies_and_boards():
+    async def scenario():
+        outbox = Outbox(rate=1, per=0.05)
+        channel = Channel()
+        # Holds the bucket so the rest queue up behind it
+        await outbox.send(channel, content="first")
+        outbox.send(channel, PRIORITY_BOARD, content="board")
+        outbox.send(channel, PRIORITY_REPLY, content="reply")
+        outbox.send(channel, PRIORITY_RESULT, content="result")
+        await outbox.drain()
+        return [content for _, content in channel.sent]
+    assert asyncio.run(scenario()) == ["first", "result", "reply", "board"]
+
+def test_429_is_retried_and_counted():
+    async def scenario():
+        outbox = Outbox(rate=5, per=1)
+        channel = Channel()
+        calls = []
+
+        async def job():
+            calls.append(None)
+            if len(calls) == 1:
+                response = SimpleNamespace(status=429, reason="Too Many Requests", headers={"Retry-After": "0"})
+                raise discord.HTTPException(response, "rate limited")
+            return "ok"
+        result = await outbox.submit(channel, job)
+        return result, len(calls), outbox.rate_limited
+    assert asyncio.run(scenario()) == ("ok", 2, 1)
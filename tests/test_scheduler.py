@@ -0,0 +1,53 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from taixiu.scheduler import Scheduler
+
+def run_jobs(arrange, wait=0.2):
+    fired = []
+
+    async def scenario():
+        scheduler = Scheduler()
+
+        def job(name):
+            async def callback():
+                fired.append(name)
+            return callback
+
+        arrange(scheduler, job, datetime.now(timezone.utc))
+        scheduler.start()
+        await asyncio.sleep(wait)
+        scheduler._task.cancel()
+    asyncio.run(scenario())
+    return fired
+
+# ===== ORDERING =====
+def test_overdue_jobs_fire_in_deadline_order():
+    def arrange(scheduler, job, now):
+        scheduler.schedule("late", now - timedelta(seconds=1), job("late"))
+        scheduler.schedule("later", now + timedelta(milliseconds=50), job("later"))
+        scheduler.schedule("early", now - timedelta(seconds=5), job("early"))
+    assert run_jobs(arrange) == ["early", "late", "later"]
+
+def test_rearming_replaces_the_old_deadline():
+    def arrange(scheduler, job, now):
+        scheduler.schedule("a", now - timedelta(seconds=2), job("a-old"))
+        scheduler.schedule("b", now - timedelta(seconds=1), job("b"))
+        scheduler.schedule("a", now + timedelta(milliseconds=50), job("a-new"))
+    assert run_jobs(arrange) == ["b", "a-new"]
+
+def test_cancelled_jobs_never_fire():
+    def arrange(scheduler, job, now):
+        scheduler.schedule("a", now + timedelta(milliseconds=50), job("a"))
+        scheduler.schedule("b", now + timedelta(milliseconds=60), job("b"))
+        scheduler.cancel("a")
+        assert scheduler.deadline("a") is None
+    assert run_jobs(arrange) == ["b"]
+
+def test_a_failing_job_does_not_stop_the_scheduler():
+    def arrange(scheduler, job, now):
+        async def boom():
+            raise RuntimeError("boom")
+        scheduler.schedule("boom", now - timedelta(seconds=1), boom)
+        scheduler.schedule("after", now, job("after"))
+    assert run_jobs(arrange) == ["after"]
@@ -0,0 +1,43 @@
+import asyncio
+from datetime import datetime
+
+from taixiu.storage import DataManager, SessionStore
+
+EXPIRES = datetime(2026, 1, 1)
+
+def open_stores(tmp_path):
+    db = DataManager(lambda: str(tmp_path / "data.json"))
+    sessions = SessionStore(lambda: str(tmp_path / "blackjack.json"), ledger=db)
+    db.load()
+    sessions.load()
+    return db, sessions
+
+# ===== STAKES BEFORE SESSIONS =====
+# Only the session store is flushed, as if its write-behind task ran first
+# and the process died before the user store's did
+def test_stored_hand_has_its_stake_taken(tmp_path):
+    db, sessions = open_stores(tmp_path)
+    db.create_user("1", "an")
+    db.apply_batch({"1": {"balance": -300}})
+    sessions.open("1", "an", 10, 300, [1, 2], [3, 4], EXPIRES)
+    sessions.flush()
+
+    db, sessions = open_stores(tmp_path)
+    assert db.get_user("1").balance == 700
+    assert sessions.user_session_count("1") == 1
+
+def test_stored_close_has_its_payout(tmp_path):
+    async def main():
+        db, sessions = open_stores(tmp_path)
+        db.create_user("1", "an")
+        db.apply_batch({"1": {"balance": -300}})
+        session = sessions.open("1", "an", 10, 300, [1, 2], [3, 4], EXPIRES)
+        await sessions.flush_async()
+        db.credit("1", 600)
+        sessions.close(session)
+        await sessions.flush_async()
+
+    asyncio.run(main())
+    db, sessions = open_stores(tmp_path)
+    assert db.get_user("1").balance == 1300
+    assert sessions.user_session_count("1") == 0
@@ -0,0 +1,76 @@
+import asyncio
+
+from taixiu.storage import DataManager, SQLiteDataManager
+
+def open_store(path, **kwargs):
+    db = SQLiteDataManager(lambda: str(path), **kwargs)
+    db.load()
+    return db
+
+# ===== READS OFF THE EVENT LOOP =====
+def test_fetch_users_merges_unflushed_rows(tmp_path):
+    async def main():
+        db = open_store(tmp_path / "data.db")
+        for uid in ("1", "2", "3"):
+            db.create_user(uid, f"user{uid}")
+        await db.flush_async()
+        db.credit("2", 500)
+        db.create_user("4", "user4")
+        users = dict(await db.fetch_users())
+        db.close()
+        return users
+
+    users = asyncio.run(main())
+    assert sorted(users) == ["1", "2", "3", "4"]
+    assert users["2"].balance == 1500
+
+def test_rows_evicted_after_flush_are_prefetched_again(tmp_path):
+    async def main():
+        db = open_store(tmp_path / "data.db", cache_size=0)
+        db.create_user("1", "an")
+        await db.flush_async()
+        evicted = db.peek_user("1")
+        await db.prefetch("1")
+        peeked = db.peek_user("1")
+        db.close()
+        return evicted, peeked
+
+    evicted, peeked = asyncio.run(main())
+    assert evicted is None
+    assert peeked.username == "an"
+
+# ===== IMPORT =====
+def test_empty_database_imports_data_json_and_journal(tmp_path):
+    json_path = tmp_path / "data.json"
+    source = DataManager(lambda: str(json_path))
+    source.load()
+    source.create_user("1", "an")
+    source.create_user("2", "binh")
+    source.flush(compact=True)
+    # Only in the journal
+    source.credit("2", 10 ** 20)
+    source.update_user("1", married_to="2")
+    source.flush()
+
+    db = SQLiteDataManager(lambda: str(tmp_path / "data.db"), import_path_func=lambda: str(json_path))
+    db.load()
+    users = dict(db.iter_users())
+    db.close()
+    assert sorted(users) == ["1", "2"]
+    assert users["1"].married_to == "2"
+    assert users["2"].balance == 1000 + 10 ** 20
+
+def test_import_happens_only_once(tmp_path):
+    json_path = tmp_path / "data.json"
+    json_path.write_text('{"schema": 2, "users": {"1": {"username": "an", "balance": 5}}}')
+    db = SQLiteDataManager(lambda: str(tmp_path / "data.db"), import_path_func=lambda: str(json_path))
+    db.load()
+    db.credit("1", 1)
+    db.flush()
+    db.close()
+
+    db = SQLiteDataManager(lambda: str(tmp_path / "data.db"), import_path_func=lambda: str(json_path))
+    db.load()
+    balance = db.get_user("1").balance
+    db.close()
+    assert balance == 6